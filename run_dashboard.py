@@ -1,15 +1,18 @@
 #!/usr/bin/env python3
 """
 Standalone script to run the earthquake dashboard.
-This fixes the eventlet import order issue.
-"""
 
-# IMPORTANT: monkey patch MUST be first
-import eventlet
-eventlet.monkey_patch()
+Socket.IO runs on python-socketio's native asyncio server with the Flask
+routes mounted behind it, all served by uvicorn. Equivalent production command:
+
+    uvicorn run_dashboard:asgi_app --host 127.0.0.1 --port 5000
+"""
 
 from seismowatch.dashboard import create_dashboard
 
+dashboard = create_dashboard()
+asgi_app = dashboard.asgi_app
+
 if __name__ == '__main__':
     print('🌐 Launching Real-time Earthquake Dashboard...')
     print('🚨 Live monitoring with WebSocket updates!')
@@ -17,5 +20,4 @@ if __name__ == '__main__':
     print('🔴 LIVE earthquake alerts will appear in real-time!')
     print('Press Ctrl+C to stop\n')
     
-    dashboard = create_dashboard()
-    dashboard.run(host='127.0.0.1', port=5000, debug=False)
+    dashboard.run(host='127.0.0.1', port=5000)
@@ -2,14 +2,38 @@
 """Build static site for GitHub Pages deployment."""
 
 import os
+import re
 import shutil
 import json
+import gzip
+import hashlib
+import struct
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-def create_index_html():
-    """Create the main index.html for the static site."""
-    
-    html_content = '''<!DOCTYPE html>
+# Minifiers and brotli are optional; without them the build ships sources as-is
+try:
+    import htmlmin
+except ImportError:
+    htmlmin = None
+
+try:
+    from csscompressor import compress as cssmin
+except ImportError:
+    cssmin = None
+
+try:
+    from rjsmin import jsmin
+except ImportError:
+    jsmin = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Main index.html for the static site
+INDEX_HTML = '''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -32,11 +56,24 @@ def create_index_html():
     <meta property="twitter:description" content="Monitor earthquakes worldwide with real-time alerts and beautiful visualizations">
     <meta property="twitter:image" content="https://snakewizardd.github.io/ccbox/assets/og-image.png">
     
+    <!-- Warm up connections to third-party origins while the HTML parses -->
+    {{USGS_PRECONNECT}}
+    <link rel="preconnect" href="https://unpkg.com">
+    <link rel="preconnect" href="https://cdn.jsdelivr.net">
+    <link rel="preconnect" href="https://tile.openstreetmap.org">
+    
     <link rel="icon" type="image/x-icon" href="/favicon.ico">
-    <script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
-    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-    <link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css" />
-    <link rel="stylesheet" href="assets/styles.css">
+    <script defer src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
+    <script defer src="https://cdn.jsdelivr.net/npm/chart.js"></script>
+    
+    <!-- Above-the-fold rules are inlined; full stylesheets load without blocking render -->
+    <style>{{CRITICAL_CSS}}</style>
+    <link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css" media="print" onload="this.media='all'">
+    <link rel="stylesheet" href="{{STYLES_HREF}}" media="print" onload="this.media='all'">
+    <noscript>
+        <link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css">
+        <link rel="stylesheet" href="{{STYLES_HREF}}">
+    </noscript>
 </head>
 <body>
     <nav class="navbar">
@@ -204,16 +241,12 @@ def create_index_html():
         </div>
     </footer>
 
-    <script src="assets/app.js"></script>
+    <script defer src="{{APP_SRC}}"></script>
 </body>
 </html>'''
-    
-    return html_content
 
-def create_css():
-    """Create the CSS styles for the static site."""
-    
-    css_content = '''/* Reset and base styles */
+# CSS styles for the static site
+STYLES_CSS = '''/* Reset and base styles */
 * {
     margin: 0;
     padding: 0;
@@ -237,7 +270,7 @@ body {
 /* Navigation */
 .navbar {
     background: rgba(0, 0, 0, 0.1);
-    backdrop-filter: blur(10px);
+    will-change: background-color;
     position: fixed;
     top: 0;
     width: 100%;
@@ -285,7 +318,6 @@ body {
     color: white;
     padding: 8rem 2rem 4rem;
     background: rgba(0, 0, 0, 0.3);
-    backdrop-filter: blur(5px);
 }
 
 .hero-title {
@@ -351,12 +383,18 @@ body {
 
 .stat-card {
     background: rgba(255, 255, 255, 0.1);
-    backdrop-filter: blur(10px);
     padding: 2rem;
     border-radius: 15px;
     border: 1px solid rgba(255, 255, 255, 0.2);
 }
 
+/* Backdrop blur re-rasterizes on scroll, so keep it off the navbar/hero */
+@supports (backdrop-filter: blur(10px)) {
+    .stat-card {
+        backdrop-filter: blur(10px);
+    }
+}
+
 .stat-card h3 {
     font-size: 2.5rem;
     color: #ffeb3b;
@@ -608,54 +646,82 @@ body {
 .loading {
     animation: pulse 2s infinite;
 }'''
-    
-    return css_content
 
-def create_javascript():
-    """Create the JavaScript for the static site."""
-    
-    js_content = '''// Earthquake monitoring application
+# JavaScript for the static site
+APP_JS = '''// Earthquake monitoring application
+
+// Same-origin caching proxy (e.g. the dashboard's /api/feed); empty means query USGS directly
+const FEED_URL = '{{FEED_URL}}';
+
+// Row layout shared with the proxy's compact format (FEED_COLUMNS in seismowatch/dashboard.py)
+const LAT = 0, LON = 1, DEPTH = 2, MAG = 3, TIME = 4, PLACE = 5, SIG = 6, ID = 7, TSUNAMI = 8;
+
 class EarthquakeMonitor {
     constructor() {
         this.map = null;
         this.earthquakeLayer = null;
-        this.earthquakes = [];
+        this.markers = new Map();  // earthquake id -> marker, reused across refreshes
+        this.earthquakes = [];  // feed rows, see the column indexes above
         this.magChart = null;
         this.hourlyChart = null;
+        this.abortController = null;  // in-flight loadEarthquakeData request
+        this.refreshTimer = null;
         this.init();
     }
 
     init() {
+        // Look up the elements we update on every refresh once
+        this.els = Object.fromEntries([
+            'total-earthquakes', 'max-magnitude', 'active-regions',
+            'live-count', 'live-max-mag', 'live-avg-depth', 'refresh-btn'
+        ].map(id => [id, document.getElementById(id)]));
+        
         this.loadInitialStats();
         this.initMap();
         this.initCharts();
         this.loadEarthquakeData();
         this.setupEventListeners();
-        
+        this.startAutoRefresh();
+    }
+
+    startAutoRefresh() {
         // Auto-refresh every 5 minutes
-        setInterval(() => this.loadEarthquakeData(), 5 * 60 * 1000);
+        clearInterval(this.refreshTimer);
+        this.refreshTimer = setInterval(() => this.loadEarthquakeData(), 5 * 60 * 1000);
+    }
+
+    feedUrl() {
+        if (FEED_URL) return FEED_URL + (FEED_URL.includes('?') ? '&' : '?') + 'format=compact';
+        const yesterday = new Date(Date.now() - 24*60*60*1000).toISOString();
+        return `https://earthquake.usgs.gov/fdsnws/event/1/query?format=geojson&starttime=${yesterday}&minmagnitude=4.0`;
+    }
+
+    async fetchRows(signal) {
+        const response = await fetch(this.feedUrl(), { signal });
+        
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+        
+        const data = await response.json();
+        if (data.rows) return data.rows;
+        
+        // Direct USGS GeoJSON: flatten into the same row layout
+        return (data.features || []).map(eq => {
+            const coords = eq.geometry.coordinates;
+            const props = eq.properties;
+            return [coords[1], coords[0], coords[2], props.mag, props.time, props.place, props.sig, eq.id, props.tsunami];
+        });
     }
 
     async loadInitialStats() {
         try {
-            const response = await fetch('https://earthquake.usgs.gov/fdsnws/event/1/query?format=geojson&starttime=' +
-                new Date(Date.now() - 24*60*60*1000).toISOString() + '&minmagnitude=4.0');
-            const data = await response.json();
-            
-            if (data.features) {
-                const earthquakes = data.features;
-                const magnitudes = earthquakes.map(eq => eq.properties.mag).filter(m => m !== null);
-                
-                document.getElementById('total-earthquakes').textContent = earthquakes.length;
-                document.getElementById('max-magnitude').textContent = magnitudes.length > 0 ? 
-                    'M' + Math.max(...magnitudes).toFixed(1) : 'N/A';
-                
-                // Count active regions (rough estimate)
-                const regions = new Set(earthquakes.map(eq => 
-                    Math.floor(eq.geometry.coordinates[1] / 10) + ',' + Math.floor(eq.geometry.coordinates[0] / 10)
-                ));
-                document.getElementById('active-regions').textContent = regions.size;
-            }
+            const summary = this.summarize(await this.fetchRows());
+            this.setText({
+                'total-earthquakes': summary.count,
+                'max-magnitude': summary.maxMag,
+                'active-regions': summary.regions
+            });
         } catch (error) {
             console.error('Error loading initial stats:', error);
         }
@@ -664,8 +730,15 @@ class EarthquakeMonitor {
     initMap() {
         if (!document.getElementById('earthquake-map')) return;
         
-        this.map = L.map('earthquake-map').setView([20, 0], 2);
-        L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
+        // Canvas draws every marker in one paint instead of one SVG node each
+        this.map = L.map('earthquake-map', { preferCanvas: true }).setView([20, 0], 2);
+        // One HTTP/2 host (no a/b/c shards); skip tiles for in-between zoom levels,
+        // but load while panning and keep a ring of off-screen tiles so pans aren't blank
+        L.tileLayer('https://tile.openstreetmap.org/{z}/{x}/{y}.png', {
+            maxZoom: 19,
+            updateWhenZooming: false,
+            updateWhenIdle: false,
+            keepBuffer: 4,
             attribution: '© OpenStreetMap contributors'
         }).addTo(this.map);
         
@@ -706,102 +779,131 @@ class EarthquakeMonitor {
     }
 
     async loadEarthquakeData() {
+        // Cancel a still-running refresh so an older response can't overwrite a newer one
+        if (this.abortController) this.abortController.abort();
+        const controller = this.abortController = new AbortController();
+        
         try {
             this.updateLoadingState(true);
             
-            // Clear existing markers
-            if (this.earthquakeLayer) {
-                this.earthquakeLayer.clearLayers();
-            }
-            
-            const yesterday = new Date(Date.now() - 24*60*60*1000).toISOString();
-            const response = await fetch(
-                `https://earthquake.usgs.gov/fdsnws/event/1/query?format=geojson&starttime=${yesterday}&minmagnitude=4.0&limit=100`
-            );
-            
-            if (!response.ok) {
-                throw new Error(`HTTP error! status: ${response.status}`);
-            }
-            
-            const data = await response.json();
+            const rows = await this.fetchRows(controller.signal);
             
-            if (!data.features || data.features.length === 0) {
+            if (rows.length === 0) {
+                this.earthquakes = [];
+                this.updateMap();
                 this.updateStats(0, 'N/A', 'N/A');
                 return;
             }
             
-            this.earthquakes = data.features;
+            this.earthquakes = rows;
             this.updateStats();
             this.updateMap();
             this.renderCharts();
             
         } catch (error) {
+            if (error.name === 'AbortError') return;
             console.error('Error loading earthquake data:', error);
             this.updateStats('Error', 'Error', 'Error');
         } finally {
-            this.updateLoadingState(false);
+            if (this.abortController === controller) {
+                this.abortController = null;
+                this.updateLoadingState(false);
+            }
         }
     }
 
-    updateStats(count = null, maxMag = null, avgDepth = null) {
-        if (count === null) {
-            count = this.earthquakes.length;
-        }
-        
-        if (maxMag === null) {
-            const magnitudes = this.earthquakes.map(eq => eq.properties.mag).filter(m => m !== null);
-            maxMag = magnitudes.length > 0 ? 'M' + Math.max(...magnitudes).toFixed(1) : 'N/A';
+    summarize(rows) {
+        // One pass for every stat: no intermediate arrays and no Math.max(...spread)
+        let maxMag = -Infinity, depthSum = 0, depthCount = 0;
+        const regions = new Set();
+        for (const eq of rows) {
+            const mag = eq[MAG];
+            const depth = eq[DEPTH];
+            if (mag !== null && mag > maxMag) maxMag = mag;
+            if (depth !== null) {
+                depthSum += depth;
+                depthCount++;
+            }
+            // Count active regions (rough estimate)
+            regions.add(Math.floor(eq[LAT] / 10) + ',' + Math.floor(eq[LON] / 10));
         }
         
-        if (avgDepth === null) {
-            const depths = this.earthquakes.map(eq => eq.geometry.coordinates[2]).filter(d => d !== null);
-            avgDepth = depths.length > 0 ? (depths.reduce((a, b) => a + b, 0) / depths.length).toFixed(1) + ' km' : 'N/A';
+        return {
+            count: rows.length,
+            maxMag: maxMag > -Infinity ? 'M' + maxMag.toFixed(1) : 'N/A',
+            avgDepth: depthCount > 0 ? (depthSum / depthCount).toFixed(1) + ' km' : 'N/A',
+            regions: regions.size
+        };
+    }
+
+    updateStats(count = null, maxMag = null, avgDepth = null) {
+        if (count === null) {
+            ({ count, maxMag, avgDepth } = this.summarize(this.earthquakes));
         }
         
-        const countEl = document.getElementById('live-count');
-        const maxMagEl = document.getElementById('live-max-mag');
-        const avgDepthEl = document.getElementById('live-avg-depth');
-        
-        if (countEl) countEl.textContent = count;
-        if (maxMagEl) maxMagEl.textContent = maxMag;
-        if (avgDepthEl) avgDepthEl.textContent = avgDepth;
+        this.setText({ 'live-count': count, 'live-max-mag': maxMag, 'live-avg-depth': avgDepth });
+    }
+
+    setText(values) {
+        // Batch DOM writes into the next frame to coalesce reflows
+        requestAnimationFrame(() => {
+            Object.entries(values).forEach(([id, text]) => {
+                const el = this.els[id];
+                if (el) el.textContent = text;
+            });
+        });
     }
 
     updateMap() {
         if (!this.map || !this.earthquakeLayer) return;
         
+        // Diff by id so unchanged markers survive a refresh
+        const current = new Set();
         this.earthquakes.forEach(eq => {
-            const coords = eq.geometry.coordinates;
-            const props = eq.properties;
-            
-            if (coords[1] && coords[0] && props.mag) {
-                const color = this.getMagnitudeColor(props.mag);
-                const marker = L.circleMarker([coords[1], coords[0]], {
-                    radius: Math.max(5, props.mag * 3),
-                    fillColor: color,
+            if (eq[LAT] && eq[LON] && eq[MAG]) {
+                current.add(eq[ID]);
+                if (this.markers.has(eq[ID])) return;
+                
+                const marker = L.circleMarker([eq[LAT], eq[LON]], {
+                    radius: Math.max(5, eq[MAG] * 3),
+                    fillColor: this.getMagnitudeColor(eq[MAG]),
                     color: '#000',
                     weight: 1,
                     opacity: 1,
                     fillOpacity: 0.8
                 });
                 
-                const time = new Date(props.time);
-                marker.bindPopup(`
-                    <div style="color: #000; font-weight: bold; min-width: 200px;">
-                        <h3 style="margin: 0; color: ${color};">M${props.mag} Earthquake</h3>
-                        <p style="margin: 0.5rem 0;"><strong>Location:</strong> ${props.place}</p>
-                        <p style="margin: 0.5rem 0;"><strong>Time:</strong> ${time.toLocaleString()}</p>
-                        <p style="margin: 0.5rem 0;"><strong>Depth:</strong> ${coords[2].toFixed(1)} km</p>
-                        <p style="margin: 0.5rem 0;"><strong>Significance:</strong> ${props.sig || 'N/A'}</p>
-                        ${props.tsunami ? '<p style="color: red; font-weight: bold;">🌊 TSUNAMI WARNING</p>' : ''}
-                    </div>
-                `);
+                // Popup HTML is only built when a marker is actually opened
+                marker.bindPopup(() => this.renderPopup(eq));
                 
+                this.markers.set(eq[ID], marker);
                 this.earthquakeLayer.addLayer(marker);
             }
         });
         
-        console.log(`Added ${this.earthquakes.length} earthquakes to map`);
+        this.markers.forEach((marker, id) => {
+            if (!current.has(id)) {
+                this.earthquakeLayer.removeLayer(marker);
+                this.markers.delete(id);
+            }
+        });
+        
+        console.log(`Showing ${this.markers.size} earthquakes on map`);
+    }
+
+    renderPopup(eq) {
+        const color = this.getMagnitudeColor(eq[MAG]);
+        const time = new Date(eq[TIME]);
+        return `
+            <div style="color: #000; font-weight: bold; min-width: 200px;">
+                <h3 style="margin: 0; color: ${color};">M${eq[MAG]} Earthquake</h3>
+                <p style="margin: 0.5rem 0;"><strong>Location:</strong> ${eq[PLACE]}</p>
+                <p style="margin: 0.5rem 0;"><strong>Time:</strong> ${time.toLocaleString()}</p>
+                <p style="margin: 0.5rem 0;"><strong>Depth:</strong> ${eq[DEPTH].toFixed(1)} km</p>
+                <p style="margin: 0.5rem 0;"><strong>Significance:</strong> ${eq[SIG] || 'N/A'}</p>
+                ${eq[TSUNAMI] ? '<p style="color: red; font-weight: bold;">🌊 TSUNAMI WARNING</p>' : ''}
+            </div>
+        `;
     }
 
     renderCharts() {
@@ -810,9 +912,9 @@ class EarthquakeMonitor {
         const magBuckets = [0, 0, 0, 0];
         const hourly = Array(24).fill(0);
         this.earthquakes.forEach(eq => {
-            const m = eq.properties.mag || 0;
+            const m = eq[MAG] || 0;
             if (m >= 7) magBuckets[3]++; else if (m >= 6) magBuckets[2]++; else if (m >= 5) magBuckets[1]++; else if (m >= 4) magBuckets[0]++;
-            const h = new Date(eq.properties.time).getUTCHours();
+            const h = new Date(eq[TIME]).getUTCHours();
             hourly[h]++;
         });
 
@@ -825,7 +927,7 @@ class EarthquakeMonitor {
     }
 
     updateLoadingState(isLoading) {
-        const refreshBtn = document.getElementById('refresh-btn');
+        const refreshBtn = this.els['refresh-btn'];
         if (refreshBtn) {
             refreshBtn.disabled = isLoading;
             refreshBtn.textContent = isLoading ? '⏳ Loading...' : '🔄 Refresh Data';
@@ -834,7 +936,7 @@ class EarthquakeMonitor {
         // Add loading class to stats
         const stats = ['live-count', 'live-max-mag', 'live-avg-depth'];
         stats.forEach(id => {
-            const el = document.getElementById(id);
+            const el = this.els[id];
             if (el) {
                 if (isLoading) {
                     el.classList.add('loading');
@@ -847,13 +949,23 @@ class EarthquakeMonitor {
     }
 
     setupEventListeners() {
-        const refreshBtn = document.getElementById('refresh-btn');
+        const refreshBtn = this.els['refresh-btn'];
         if (refreshBtn) {
             refreshBtn.addEventListener('click', () => {
                 this.loadEarthquakeData();
             });
         }
 
+        // Stop polling while the tab is in the background
+        document.addEventListener('visibilitychange', () => {
+            if (document.hidden) {
+                clearInterval(this.refreshTimer);
+                this.refreshTimer = null;
+            } else {
+                this.startAutoRefresh();
+            }
+        });
+
         // Smooth scrolling for navigation links
         document.querySelectorAll('a[href^="#"]').forEach(anchor => {
             anchor.addEventListener('click', function (e) {
@@ -875,17 +987,184 @@ document.addEventListener('DOMContentLoaded', () => {
     new EarthquakeMonitor();
 });
 
-// Add some visual enhancements
+// Add some visual enhancements, updating the navbar at most once per frame
+let lastScrollY = 0;
+let scrollTicking = false;
 window.addEventListener('scroll', () => {
-    const navbar = document.querySelector('.navbar');
-    if (window.scrollY > 100) {
-        navbar.style.background = 'rgba(0, 0, 0, 0.9)';
-    } else {
-        navbar.style.background = 'rgba(0, 0, 0, 0.1)';
-    }
-});'''
+    lastScrollY = window.scrollY;
+    if (scrollTicking) return;
+    scrollTicking = true;
+    requestAnimationFrame(() => {
+        const navbar = document.querySelector('.navbar');
+        navbar.style.background = lastScrollY > 100 ? 'rgba(0, 0, 0, 0.9)' : 'rgba(0, 0, 0, 0.1)';
+        scrollTicking = false;
+    });
+}, { passive: true });'''
+
+# 404 page
+NOT_FOUND_HTML = """<!DOCTYPE html>
+<html>
+<head>
+    <title>404 - Page Not Found | SeismoWatch</title>
+    <style>
+        body { font-family: Arial, sans-serif; text-align: center; padding: 4rem; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; min-height: 100vh; display: flex; flex-direction: column; justify-content: center; }
+        h1 { font-size: 4rem; margin-bottom: 1rem; }
+        p { font-size: 1.2rem; margin-bottom: 2rem; }
+        a { color: #ffeb3b; text-decoration: none; font-weight: bold; }
+    </style>
+</head>
+<body>
+    <h1>404</h1>
+    <p>Oops! This page seems to have shifted like tectonic plates.</p>
+    <p><a href="/">← Return to SeismoWatch Home</a></p>
+</body>
+</html>"""
+
+def create_favicon(size=16, color=(0x6b, 0x6b, 0xff)):
+    """Create a single-image 32-bit ICO: a filled circle on a transparent background.
+
+    ``color`` is (blue, green, red), the byte order of ICO bitmaps.
+    """
+    # AND mask rows are 1 bit per pixel, padded to 32 bits
+    image_size = 40 + size * size * 4 + size * ((size + 31) // 32 * 4)
+    # ICONDIR header followed by one ICONDIRENTRY pointing just past itself
+    header = struct.pack("<HHH", 0, 1, 1)
+    entry = struct.pack("<BBBBHHII", size, size, 0, 0, 1, 32, image_size, 6 + 16)
+    # BITMAPINFOHEADER; the height covers both the XOR and AND masks
+    info = struct.pack("<IiiHHIIiiII", 40, size, size * 2, 1, 32, 0, 0, 0, 0, 0, 0)
+    
+    center = (size - 1) / 2
+    radius_sq = (size / 2) ** 2
+    pixels = bytearray()
+    for y in range(size):  # Bitmap rows are stored bottom-up
+        for x in range(size):
+            inside = (x - center) ** 2 + (y - center) ** 2 <= radius_sq
+            pixels += bytes(color) + (b"\xff" if inside else b"\x00")
+    # All-zero AND mask: transparency comes from the alpha channel
+    and_mask = bytes(image_size - 40 - len(pixels))
+    
+    return header + entry + info + bytes(pixels) + and_mask
+
+# 16x16 favicon
+FAVICON_ICO_BYTES = create_favicon()
+
+# Custom domain for GitHub Pages
+CNAME = "seismowatch.dev"
+
+def fingerprint(filename, payload):
+    """Return ``filename`` with a short content hash, e.g. ``styles.1a2b3c4d5e6f.css``."""
+    stem, ext = filename.rsplit(".", 1)
+    digest = hashlib.blake2b(payload, digest_size=6).hexdigest()
+    return f"{stem}.{digest}.{ext}"
+
+def minify_html(source):
+    """Strip comments and inter-tag whitespace from an HTML page."""
+    if htmlmin is None:
+        return source
+    return htmlmin.minify(source, remove_comments=True, remove_empty_space=True)
+
+def minify_css(source):
+    """Minify a stylesheet."""
+    return cssmin(source) if cssmin else source
+
+def minify_js(source):
+    """Minify a script."""
+    return jsmin(source) if jsmin else source
+
+def precompressed(path, payload):
+    """Return ``.gz``/``.br`` siblings of ``path`` for gzip_static/brotli_static."""
+    # mtime=0 keeps the gzip output stable so the build cache can skip it
+    jobs = [(path.with_name(path.name + ".gz"), gzip.compress(payload, 9, mtime=0))]
+    if brotli is not None:
+        jobs.append((path.with_name(path.name + ".br"), brotli.compress(payload, quality=11)))
+    return jobs
+
+# Selectors styling the navbar and hero, i.e. everything visible on first paint
+CRITICAL_SELECTOR_PREFIXES = ("*", "body", ".container", ".nav", ".hero", ".btn", ".stat-card")
+
+def css_blocks(css):
+    """Split a stylesheet into its top-level rules and at-rule blocks."""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    blocks = []
+    depth = start = 0
+    for i, char in enumerate(css):
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                blocks.append(css[start:i + 1].strip())
+                start = i + 1
+    return blocks
+
+def is_critical(block):
+    """True if every selector in ``block`` (or inside its at-rule) is above the fold."""
+    preludes = re.findall(r"([^{}]+)\{", block)
+    if block.startswith("@"):
+        preludes = preludes[1:]
+    selectors = [sel.strip() for prelude in preludes for sel in prelude.split(",")]
+    return bool(selectors) and all(sel.startswith(CRITICAL_SELECTOR_PREFIXES) for sel in selectors)
+
+CRITICAL_CSS = minify_css("\n".join(block for block in css_blocks(STYLES_CSS) if is_critical(block)))
+
+# Set when the site is served next to the dashboard, e.g. SEISMOWATCH_FEED_URL=/api/feed
+FEED_URL = os.environ.get("SEISMOWATCH_FEED_URL", "")
+
+# Payloads are minified and encoded once at import so build_site() only does raw writes
+STYLES_CSS_BYTES = minify_css(STYLES_CSS).encode("utf-8")
+APP_JS_BYTES = minify_js(APP_JS.replace("{{FEED_URL}}", FEED_URL)).encode("utf-8")
+NOT_FOUND_HTML_BYTES = minify_html(NOT_FOUND_HTML).encode("utf-8")
+CNAME_BYTES = CNAME.encode("utf-8")
+
+# Fingerprinted asset names let the host serve them with a long max-age
+STYLES_CSS_NAME = fingerprint("styles.css", STYLES_CSS_BYTES)
+APP_JS_NAME = fingerprint("app.js", APP_JS_BYTES)
+
+# app.js only talks to USGS directly when no same-origin feed is configured
+USGS_PRECONNECT = (
+    "" if FEED_URL else '<link rel="preconnect" href="https://earthquake.usgs.gov" crossorigin>'
+)
+
+INDEX_HTML_BYTES = minify_html(
+    INDEX_HTML
+    .replace("{{USGS_PRECONNECT}}", USGS_PRECONNECT)
+    .replace("{{CRITICAL_CSS}}", CRITICAL_CSS)
+    .replace("{{STYLES_HREF}}", f"assets/{STYLES_CSS_NAME}")
+    .replace("{{APP_SRC}}", f"assets/{APP_JS_NAME}")
+).encode("utf-8")
+
+# Maps each output path (relative to dist/) to the hash of its last written payload
+BUILD_CACHE_NAME = ".buildcache.json"
+
+def content_hash(payload):
+    """Return the BLAKE2b hex digest used to detect unchanged outputs."""
+    return hashlib.blake2b(payload).hexdigest()
+
+def load_build_cache(dist_dir):
+    """Load the manifest from a previous build, or an empty one."""
+    try:
+        return json.loads((dist_dir / BUILD_CACHE_NAME).read_text())
+    except (OSError, ValueError):
+        return {}
+
+def write_files(dist_dir, jobs, previous, manifest):
+    """Write changed ``(path, payload)`` pairs concurrently and record their hashes.
+
+    Files whose hash matches ``previous`` and that still exist are skipped.
+    Returns the number of files actually written.
+    """
+    changed = []
+    for path, payload in jobs:
+        key = path.relative_to(dist_dir).as_posix()
+        manifest[key] = content_hash(payload)
+        if previous.get(key) != manifest[key] or not path.exists():
+            changed.append((path, payload))
     
-    return js_content
+    if changed:
+        # File I/O releases the GIL, so the writes genuinely overlap
+        with ThreadPoolExecutor(max_workers=min(8, len(changed))) as executor:
+            list(executor.map(lambda job: job[0].write_bytes(job[1]), changed))
+    return len(changed)
 
 def build_site():
     """Build the complete static site."""
@@ -894,62 +1173,46 @@ def build_site():
     dist_dir = Path("dist")
     assets_dir = dist_dir / "assets"
     
-    # Clean and create directories
-    if dist_dir.exists():
-        shutil.rmtree(dist_dir)
-    
-    dist_dir.mkdir()
-    assets_dir.mkdir()
+    # Create directories, keeping outputs from the previous build
+    assets_dir.mkdir(parents=True, exist_ok=True)
+    previous = load_build_cache(dist_dir)
+    manifest = {}
 
     docs_src = Path("docs")
     if docs_src.exists():
-        shutil.copytree(docs_src, dist_dir / "docs")
-    
-    # Create main files
-    with open(dist_dir / "index.html", "w") as f:
-        f.write(create_index_html())
-    
-    with open(assets_dir / "styles.css", "w") as f:
-        f.write(create_css())
+        shutil.copytree(docs_src, dist_dir / "docs", dirs_exist_ok=True)
     
-    with open(assets_dir / "app.js", "w") as f:
-        f.write(create_javascript())
+    # Assets, favicon and CNAME first, then the HTML pages that reference them
+    first_batch = [
+        (assets_dir / STYLES_CSS_NAME, STYLES_CSS_BYTES),
+        (assets_dir / APP_JS_NAME, APP_JS_BYTES),
+        (dist_dir / "favicon.ico", FAVICON_ICO_BYTES),
+        (dist_dir / "CNAME", CNAME_BYTES),
+    ]
+    first_batch += precompressed(assets_dir / STYLES_CSS_NAME, STYLES_CSS_BYTES)
+    first_batch += precompressed(assets_dir / APP_JS_NAME, APP_JS_BYTES)
     
     # Copy the working earthquake dashboard
     earthquake_dashboard = Path("earthquake_map.html")
     if earthquake_dashboard.exists():
-        shutil.copy2(earthquake_dashboard, dist_dir / "dashboard.html")
+        first_batch.append((dist_dir / "dashboard.html", earthquake_dashboard.read_bytes()))
     
-    # Create a simple favicon
-    with open(dist_dir / "favicon.ico", "wb") as f:
-        # Simple ICO file header for a 16x16 favicon
-        f.write(b'\\x00\\x00\\x01\\x00\\x01\\x00\\x10\\x10\\x00\\x00\\x01\\x00\\x20\\x00\\x68\\x04\\x00\\x00\\x16\\x00\\x00\\x00')
+    written = write_files(dist_dir, first_batch, previous, manifest)
+    html_pages = [
+        (dist_dir / "index.html", INDEX_HTML_BYTES),
+        (dist_dir / "404.html", NOT_FOUND_HTML_BYTES),
+    ]
+    for path, payload in list(html_pages):
+        html_pages += precompressed(path, payload)
+    written += write_files(dist_dir, html_pages, previous, manifest)
     
-    # Create CNAME file for custom domain
-    with open(dist_dir / "CNAME", "w") as f:
-        f.write("seismowatch.dev")
+    # Prune outputs from the previous build that are no longer produced
+    for stale in previous.keys() - manifest.keys():
+        (dist_dir / stale).unlink(missing_ok=True)
     
-    # Create 404 page
-    with open(dist_dir / "404.html", "w") as f:
-        f.write("""<!DOCTYPE html>
-<html>
-<head>
-    <title>404 - Page Not Found | SeismoWatch</title>
-    <style>
-        body { font-family: Arial, sans-serif; text-align: center; padding: 4rem; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; min-height: 100vh; display: flex; flex-direction: column; justify-content: center; }
-        h1 { font-size: 4rem; margin-bottom: 1rem; }
-        p { font-size: 1.2rem; margin-bottom: 2rem; }
-        a { color: #ffeb3b; text-decoration: none; font-weight: bold; }
-    </style>
-</head>
-<body>
-    <h1>404</h1>
-    <p>Oops! This page seems to have shifted like tectonic plates.</p>
-    <p><a href="/">← Return to SeismoWatch Home</a></p>
-</body>
-</html>""")
+    (dist_dir / BUILD_CACHE_NAME).write_text(json.dumps(manifest, indent=2, sort_keys=True))
     
-    print("✅ Static site built successfully!")
+    print(f"✅ Static site built successfully! ({written} of {len(manifest)} files updated)")
     print(f"📁 Output directory: {dist_dir.absolute()}")
     print("🌐 Ready for GitHub Pages deployment")
 
@@ -13,10 +13,27 @@ __version__ = "1.0.0"
 __author__ = "SeismoWatch Contributors"
 __license__ = "MIT"
 
-# Main exports
-from .earthquakes import EarthquakeDataFetcher, EarthquakeVisualizer
-from .alerts import EarthquakeMonitor, AlertZone
-from .geo import GeoVisualizer
+from importlib import import_module
+
+# Main exports, imported on first access (PEP 562) so `import seismowatch`
+# doesn't pull in pandas, folium, plotly and geopandas up front
+_LAZY_EXPORTS = {
+    'EarthquakeDataFetcher': '.earthquakes',
+    'EarthquakeVisualizer': '.earthquakes',
+    'EarthquakeMonitor': '.alerts',
+    'AlertZone': '.alerts',
+    'GeoVisualizer': '.geo',
+}
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        value = getattr(import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_EXPORTS))
 
 __all__ = [
     'EarthquakeDataFetcher',
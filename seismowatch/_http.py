@@ -0,0 +1,70 @@
+"""Response plumbing shared by the Flask apps: JSON encoding and compression."""
+
+import gzip
+
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+from . import _json
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - exercised when brotli is absent
+    brotli = None
+
+# Text responses worth compressing; tiny bodies aren't worth the CPU
+COMPRESS_MIMETYPES = {'application/json', 'text/html', 'text/css', 'application/javascript'}
+COMPRESS_MIN_SIZE = 500
+# Brotli's top qualities are meant for static assets; 5 is fast enough per request
+BROTLI_QUALITY = 5
+GZIP_LEVEL = 6
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes with orjson when it is installed.
+    
+    NumPy scalars are serialized as-is, so routes can pass pandas results
+    straight to ``jsonify``. Output is compact and keys keep their order.
+    """
+    
+    def dumps(self, obj, **kwargs) -> str:
+        return _json.dumps(obj).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return _json.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(_json.dumps(obj), mimetype=self.mimetype)
+
+def compress_responses(app):
+    """Compress text responses with Brotli when installed, else gzip.
+    
+    Compressed responses get a weak ETag, since their bytes differ from the
+    identity encoding; routes therefore match ``If-None-Match`` weakly.
+    """
+    encodings = ['br', 'gzip'] if brotli is not None else ['gzip']
+    
+    @app.after_request
+    def compress(response):
+        if (response.status_code != 200 or response.direct_passthrough
+                or response.is_streamed or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESS_MIMETYPES):
+            return response
+        response.vary.add('Accept-Encoding')
+        
+        encoding = request.accept_encodings.best_match(encodings)
+        data = response.get_data()
+        if encoding is None or len(data) < COMPRESS_MIN_SIZE:
+            return response
+        
+        if encoding == 'br':
+            response.set_data(brotli.compress(data, quality=BROTLI_QUALITY))
+        else:
+            response.set_data(gzip.compress(data, compresslevel=GZIP_LEVEL))
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+    
+    return app
@@ -0,0 +1,56 @@
+"""JSON encoding helpers that use orjson and ijson when they are installed.
+
+orjson is an optional speedup; without it the stdlib ``json`` module produces
+the same compact output. ijson, when available with a compiled backend, lets
+large arrays be decoded one item at a time.
+"""
+
+import io
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised when orjson is absent
+    orjson = None
+
+try:
+    import ijson
+    if getattr(ijson, 'backend', None) == 'python':
+        ijson = None  # The pure-Python backend is much slower than a full parse
+except ImportError:  # pragma: no cover - exercised when ijson is absent
+    ijson = None
+
+def loads(data):
+    """Parse JSON from ``bytes`` or ``str``."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dumps(obj) -> bytes:
+    """Serialize ``obj`` to compact UTF-8 JSON bytes; NumPy scalars and arrays are allowed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False, default=_numpy_default).encode('utf-8')
+
+def _numpy_default(obj):
+    """Convert NumPy values the stdlib encoder doesn't know to Python ones."""
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def iter_array(data: bytes, key: str):
+    """Iterate over the items of the top-level array ``key`` in ``data``.
+    
+    With ijson the items are decoded incrementally, so only one of them is
+    materialized at a time; otherwise the whole document is parsed up front.
+    """
+    if ijson is not None:
+        return _stream_items(data, key + '.item')
+    return iter(loads(data)[key])
+
+def _stream_items(data: bytes, prefix: str):
+    """Yield ijson items, raising malformed input as ``ValueError`` like ``loads``."""
+    try:
+        yield from ijson.items(io.BytesIO(data), prefix, use_float=True)
+    except ijson.JSONError as e:
+        raise ValueError(str(e)) from e
@@ -0,0 +1,49 @@
+"""Optional Numba-compiled kernels for the alert matching hot path.
+
+Numba is not a hard dependency; when it isn't installed ``match_zones_kernel``
+is ``None`` and callers fall back to the NumPy implementation.
+"""
+
+import math
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # pragma: no cover - exercised when numba is absent
+    njit = None
+    prange = range
+
+def _match_zones(lats, lons, mags, zone_lats, zone_lons, zone_cos,
+                 zone_hav, zone_mags, zone_lat_min, zone_lat_max, zone_lon_halfspan):
+    """Return the first matching zone index per quake, or -1.
+    
+    Latitudes and longitudes are in radians. Fuses the magnitude check,
+    bounding box and haversine comparison into one pass, stopping at the
+    first zone that matches each quake. Comparisons are written so that a
+    NaN coordinate or magnitude never matches, as in the NumPy path.
+    """
+    n = lats.shape[0]
+    out = np.full(n, -1, dtype=np.intp)
+    for i in prange(n):
+        lat = lats[i]
+        cos_lat = math.cos(lat)
+        for j in range(zone_lats.shape[0]):
+            if not (mags[i] >= zone_mags[j] and zone_lat_min[j] <= lat <= zone_lat_max[j]):
+                continue
+            dlon = abs((lons[i] - zone_lons[j] + math.pi) % (2 * math.pi) - math.pi)
+            if not dlon <= zone_lon_halfspan[j]:
+                continue
+            s_lat = math.sin((lat - zone_lats[j]) * 0.5)
+            s_lon = math.sin((lons[i] - zone_lons[j]) * 0.5)
+            if s_lat * s_lat + cos_lat * zone_cos[j] * s_lon * s_lon <= zone_hav[j]:
+                out[i] = j
+                break
+    return out
+
+if njit is not None:
+    # Full fastmath would assume no NaNs and let the compares above fold away
+    match_zones_kernel = njit(cache=True, parallel=True,
+                              fastmath={'contract', 'arcp', 'reassoc'})(_match_zones)
+else:
+    match_zones_kernel = None
@@ -1,7 +1,12 @@
+import asyncio
+import copy
 import time
-import json
+import math
 import smtplib
+import sqlite3
+import sys
 import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Callable
 from dataclasses import dataclass, asdict
@@ -10,7 +15,13 @@ from email.mime.multipart import MIMEMultipart
 import os
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
+
 from .earthquakes import EarthquakeDataFetcher
+from . import _json
+
+EARTH_RADIUS_KM = 6371.0
 
 @dataclass
 class AlertZone:
@@ -21,20 +32,139 @@ class AlertZone:
     radius_km: float
     min_magnitude: float
     
+    def __post_init__(self):
+        self._cache_geometry()
+    
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        # Keep the cached terms in step when a zone is edited in place
+        if name in ('center_lat', 'center_lon', 'radius_km') and '_lon_halfspan' in self.__dict__:
+            self._cache_geometry()
+    
+    def _cache_geometry(self):
+        """Compute everything that depends only on the zone's center and radius."""
+        lat_rad = math.radians(self.center_lat)
+        self._center_lat_rad = lat_rad
+        self._center_lon_rad = math.radians(self.center_lon)
+        self._cos_center_lat = math.cos(lat_rad)
+        # The haversine term hav(d/R) grows monotonically with distance up to
+        # half the circumference, so comparing it against hav(radius/R) avoids
+        # the arcsin; radii past that point cover the whole globe.
+        half_angle = min(self.radius_km / (2 * EARTH_RADIUS_KM), math.pi / 2)
+        self._hav_radius = math.sin(half_angle) ** 2
+        # Bounding box of the zone in radians: a cap of angular radius d spans
+        # center_lat ± d, and asin(sin d / cos center_lat) of longitude either
+        # side unless it reaches a pole, in which case every longitude is in.
+        angle = self.radius_km / EARTH_RADIUS_KM
+        self._lat_halfspan = angle
+        if abs(lat_rad) + angle < math.pi / 2:
+            self._lon_halfspan = math.asin(math.sin(angle) / math.cos(lat_rad))
+        else:
+            self._lon_halfspan = math.pi
+    
     def contains_earthquake(self, lat: float, lon: float, magnitude: float) -> bool:
         """Check if earthquake is within this alert zone."""
         if magnitude < self.min_magnitude:
             return False
         
-        # Simple distance calculation (good enough for alerts)
-        from math import sqrt, pow
-        lat_diff = abs(self.center_lat - lat)
-        lon_diff = abs(self.center_lon - lon)
+        phi = math.radians(lat)
+        a = (math.sin((phi - self._center_lat_rad) / 2) ** 2
+             + self._cos_center_lat * math.cos(phi)
+             * math.sin((math.radians(lon) - self._center_lon_rad) / 2) ** 2)
+        return a <= self._hav_radius
+    
+    def bbox_mask(self, lats, lons) -> np.ndarray:
+        """Return which points (in degrees) fall inside the zone's bounding box.
+        
+        A cheap superset of ``contains_earthquake`` for narrowing arrays of
+        quakes before the exact distance check.
+        """
+        lat = np.radians(np.asarray(lats, dtype=float))
+        lon = np.radians(np.asarray(lons, dtype=float))
+        dlon = np.abs((lon - self._center_lon_rad + np.pi) % (2 * np.pi) - np.pi)
+        return (np.abs(lat - self._center_lat_rad) <= self._lat_halfspan) & (dlon <= self._lon_halfspan)
+
+class ZoneIndex:
+    """Precomputed zone arrays used to match earthquakes against many zones.
+    
+    Candidate (quake, zone) pairs are narrowed by cheap compares before any
+    trig: the zone's magnitude threshold, then its latitude/longitude bounding
+    box. Only the survivors get the exact haversine test. With at least
+    ``KERNEL_MIN_ZONES`` zones and Numba installed, the whole match runs as
+    one compiled, parallel pass instead.
+    """
+    
+    # Below this many zones the NumPy pass is already fast, and importing
+    # Numba (seconds) would cost more than the kernel saves
+    KERNEL_MIN_ZONES = 32
+    
+    def __init__(self, zones: List[AlertZone]):
+        # Snapshots, so comparing against the live zones spots in-place edits
+        self.zones = tuple(copy.copy(zone) for zone in zones)
+        self.min_mags = np.array([z.min_magnitude for z in zones], dtype=float)
+        self.lat_rad = np.array([z._center_lat_rad for z in zones], dtype=float)
+        self.lon_rad = np.array([z._center_lon_rad for z in zones], dtype=float)
+        self.cos_lat = np.array([z._cos_center_lat for z in zones], dtype=float)
+        self.hav_radius = np.array([z._hav_radius for z in zones], dtype=float)
+        lat_halfspan = np.array([z._lat_halfspan for z in zones], dtype=float)
+        self.lat_min = self.lat_rad - lat_halfspan
+        self.lat_max = self.lat_rad + lat_halfspan
+        self.lon_halfspan = np.array([z._lon_halfspan for z in zones], dtype=float)
+        # Lowest threshold of any zone; weaker quakes can never match
+        self.min_magnitude = float(self.min_mags.min()) if zones else math.inf
+    
+    def match(self, df: pd.DataFrame) -> np.ndarray:
+        """Return the index of the first matching zone for every row, or -1."""
+        no_match = np.full(len(df), -1, dtype=np.intp)
+        if df.empty or not self.zones:
+            return no_match
+        
+        # Typical fetches hold nothing strong enough for any zone; one max()
+        # settles that before any per-pair work
+        mag = df['magnitude'].to_numpy(dtype=float)
+        if mag.max() < self.min_magnitude:
+            return no_match
         
-        # Rough conversion: 1 degree ≈ 111 km
-        distance_km = sqrt(pow(lat_diff * 111, 2) + pow(lon_diff * 111, 2))
+        lat = np.radians(df['latitude'].to_numpy(dtype=float))
+        lon = np.radians(df['longitude'].to_numpy(dtype=float))
+        if len(self.zones) >= self.KERNEL_MIN_ZONES:
+            from ._kernels import match_zones_kernel
+            if match_zones_kernel is not None:
+                return match_zones_kernel(lat, lon, mag, self.lat_rad, self.lon_rad, self.cos_lat,
+                                          self.hav_radius, self.min_mags, self.lat_min, self.lat_max,
+                                          self.lon_halfspan)
         
-        return distance_km <= self.radius_km
+        # Longitude difference wrapped into [-pi, pi) so the antimeridian works
+        dlon = np.abs((lon[:, None] - self.lon_rad + np.pi) % (2 * np.pi) - np.pi)
+        rows, cols = np.nonzero(
+            (mag[:, None] >= self.min_mags)
+            & (lat[:, None] >= self.lat_min)
+            & (lat[:, None] <= self.lat_max)
+            & (dlon <= self.lon_halfspan)
+        )
+        if rows.size == 0:
+            return no_match
+        
+        lat = lat[rows]
+        lon = lon[rows]
+        
+        # Haversine terms for the candidate pairs, compared in hav space
+        a = (np.sin((lat - self.lat_rad[cols]) / 2) ** 2
+             + np.cos(lat) * self.cos_lat[cols] * np.sin((lon - self.lon_rad[cols]) / 2) ** 2)
+        hit = np.zeros((len(df), len(self.zones)), dtype=bool)
+        hit[rows, cols] = a <= self.hav_radius[cols]
+        
+        # argmax picks the first True column, i.e. the first zone in list order
+        return np.where(hit.any(axis=1), hit.argmax(axis=1), no_match)
+
+def match_zones(df: pd.DataFrame, zones: List[AlertZone]) -> np.ndarray:
+    """Return the index of the first matching zone for every earthquake in ``df``.
+    
+    Uses the same great-circle rule as ``AlertZone.contains_earthquake`` but
+    evaluates all earthquakes against all zones in one NumPy pass. Rows that
+    match no zone get -1.
+    """
+    return ZoneIndex(zones).match(df)
 
 @dataclass
 class EarthquakeAlert:
@@ -50,30 +180,61 @@ class EarthquakeAlert:
     alert_time: datetime
     tsunami_warning: bool = False
 
+# Alert message layouts, filled with str.format(alert=..., time=..., tsunami=...)
+_CONSOLE_TEMPLATE = (
+    "\n" + "=" * 80 + "\n"
+    "🚨 EARTHQUAKE ALERT! 🚨\n"
+    "📍 Zone: {alert.zone_name}\n"
+    "📊 Magnitude: {alert.magnitude}\n"
+    "🌍 Location: {alert.location}\n"
+    "⏰ Time: {time}\n"
+    "📏 Depth: {alert.depth:.1f} km\n"
+    "📍 Coordinates: {alert.latitude:.3f}, {alert.longitude:.3f}\n"
+    "{tsunami}"
+    + "=" * 80 + "\n\n"
+)
+
+_EMAIL_TEMPLATE = """
+🚨 EARTHQUAKE DETECTED! 🚨
+
+📊 Magnitude: {alert.magnitude}
+🌍 Location: {alert.location}
+⏰ Time: {time}
+📏 Depth: {alert.depth:.1f} km
+📍 Coordinates: {alert.latitude:.3f}, {alert.longitude:.3f}
+🎯 Alert Zone: {alert.zone_name}{tsunami}
+
+This is an automated alert from your Earthquake Monitoring System.
+            """
+
 class NotificationHandler:
     """Base class for alert notifications."""
     
     def send_alert(self, alert: EarthquakeAlert) -> bool:
         """Send alert notification. Return True if successful."""
         raise NotImplementedError
+    
+    def send_alerts(self, alerts: List[EarthquakeAlert]) -> bool:
+        """Send every alert from one monitoring check. Return True if all succeeded."""
+        results = [self.send_alert(alert) for alert in alerts]
+        return all(results)
+    
+    def close(self):
+        """Release any connections held by the handler."""
+        pass
 
 class ConsoleNotificationHandler(NotificationHandler):
     """Prints alerts to console with dramatic formatting."""
     
     def send_alert(self, alert: EarthquakeAlert) -> bool:
-        tsunami_warning = "🌊 TSUNAMI WARNING!" if alert.tsunami_warning else ""
+        tsunami_warning = "⚠️  🌊 TSUNAMI WARNING!\n" if alert.tsunami_warning else ""
         
-        print("\n" + "="*80)
-        print(f"🚨 EARTHQUAKE ALERT! 🚨")
-        print(f"📍 Zone: {alert.zone_name}")
-        print(f"📊 Magnitude: {alert.magnitude}")
-        print(f"🌍 Location: {alert.location}")
-        print(f"⏰ Time: {alert.time.strftime('%Y-%m-%d %H:%M:%S UTC')}")
-        print(f"📏 Depth: {alert.depth:.1f} km")
-        print(f"📍 Coordinates: {alert.latitude:.3f}, {alert.longitude:.3f}")
-        if tsunami_warning:
-            print(f"⚠️  {tsunami_warning}")
-        print("="*80 + "\n")
+        # One write for the whole banner instead of a print per line
+        sys.stdout.write(_CONSOLE_TEMPLATE.format(
+            alert=alert,
+            time=alert.time.strftime('%Y-%m-%d %H:%M:%S UTC'),
+            tsunami=tsunami_warning,
+        ))
         
         return True
 
@@ -83,14 +244,19 @@ class FileNotificationHandler(NotificationHandler):
     def __init__(self, log_file: str = "earthquake_alerts.log"):
         self.log_file = log_file
     
+    def _format_entry(self, alert: EarthquakeAlert, timestamp: str) -> str:
+        return f"[{timestamp}] M{alert.magnitude} earthquake in {alert.location} " \
+               f"({alert.latitude:.3f}, {alert.longitude:.3f}) - Zone: {alert.zone_name}\n"
+    
     def send_alert(self, alert: EarthquakeAlert) -> bool:
+        return self.send_alerts([alert])
+    
+    def send_alerts(self, alerts: List[EarthquakeAlert]) -> bool:
+        """Append all alerts from one check with a single open and write."""
         try:
             timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            log_entry = f"[{timestamp}] M{alert.magnitude} earthquake in {alert.location} " \
-                       f"({alert.latitude:.3f}, {alert.longitude:.3f}) - Zone: {alert.zone_name}\n"
-            
             with open(self.log_file, 'a') as f:
-                f.write(log_entry)
+                f.write(''.join(self._format_entry(alert, timestamp) for alert in alerts))
             return True
         except Exception as e:
             print(f"Failed to write alert to file: {e}")
@@ -106,6 +272,52 @@ class EmailNotificationHandler(NotificationHandler):
         self.username = username
         self.password = password
         self.recipients = recipients
+        self._smtp: Optional[smtplib.SMTP] = None
+    
+    def _connect(self) -> smtplib.SMTP:
+        """Open, secure and authenticate a new SMTP connection."""
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+        server.starttls()
+        server.login(self.username, self.password)
+        return server
+    
+    def _get_conn(self) -> smtplib.SMTP:
+        """Return the cached SMTP connection, reconnecting if it has gone stale."""
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._discard_conn()
+        self._smtp = self._connect()
+        return self._smtp
+    
+    def _discard_conn(self):
+        """Drop the cached connection without waiting on a dead server."""
+        if self._smtp is not None:
+            try:
+                self._smtp.close()
+            except OSError:
+                pass
+            self._smtp = None
+    
+    def _send(self, msg):
+        """Send a message over the pooled connection, retrying once on a dropped link."""
+        try:
+            self._get_conn().send_message(msg)
+        except (smtplib.SMTPServerDisconnected, smtplib.SMTPResponseException, OSError):
+            self._discard_conn()
+            self._get_conn().send_message(msg)
+    
+    def close(self):
+        """Politely end the pooled SMTP session."""
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._discard_conn()
     
     def send_alert(self, alert: EarthquakeAlert) -> bool:
         try:
@@ -116,26 +328,54 @@ class EmailNotificationHandler(NotificationHandler):
             
             tsunami_text = "\n⚠️ TSUNAMI WARNING ISSUED!" if alert.tsunami_warning else ""
             
+            body = _EMAIL_TEMPLATE.format(
+                alert=alert,
+                time=alert.time.strftime('%Y-%m-%d %H:%M:%S UTC'),
+                tsunami=tsunami_text,
+            )
+            
+            msg.attach(MIMEText(body, 'plain'))
+            
+            # One connection is kept open across alerts; all recipients go
+            # in a single transaction
+            self._send(msg)
+            
+            return True
+        except Exception as e:
+            print(f"Failed to send email alert: {e}")
+            return False
+    
+    def send_alerts(self, alerts: List[EarthquakeAlert]) -> bool:
+        """Send all alerts from one check as a single summary email."""
+        if len(alerts) == 1:
+            return self.send_alert(alerts[0])
+        
+        try:
+            strongest = max(alerts, key=lambda alert: alert.magnitude)
+            msg = MIMEMultipart()
+            msg['From'] = self.username
+            msg['To'] = ', '.join(self.recipients)
+            msg['Subject'] = (f"🚨 EARTHQUAKE ALERTS: {len(alerts)} earthquakes, "
+                              f"up to M{strongest.magnitude} - {strongest.location}")
+            
+            rows = "\n".join(
+                f"M{alert.magnitude:<4} {alert.time.strftime('%Y-%m-%d %H:%M:%S UTC')}  "
+                f"{alert.depth:6.1f} km  ({alert.latitude:.3f}, {alert.longitude:.3f})  "
+                f"{alert.location} [{alert.zone_name}]"
+                f"{'  ⚠️ TSUNAMI WARNING' if alert.tsunami_warning else ''}"
+                for alert in alerts
+            )
+            
             body = f"""
-🚨 EARTHQUAKE DETECTED! 🚨
+🚨 {len(alerts)} EARTHQUAKES DETECTED! 🚨
 
-📊 Magnitude: {alert.magnitude}
-🌍 Location: {alert.location}
-⏰ Time: {alert.time.strftime('%Y-%m-%d %H:%M:%S UTC')}
-📏 Depth: {alert.depth:.1f} km
-📍 Coordinates: {alert.latitude:.3f}, {alert.longitude:.3f}
-🎯 Alert Zone: {alert.zone_name}{tsunami_text}
+{rows}
 
 This is an automated alert from your Earthquake Monitoring System.
             """
             
             msg.attach(MIMEText(body, 'plain'))
-            
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()
-            server.login(self.username, self.password)
-            server.send_message(msg)
-            server.quit()
+            self._send(msg)
             
             return True
         except Exception as e:
@@ -145,15 +385,35 @@ This is an automated alert from your Earthquake Monitoring System.
 class EarthquakeMonitor:
     """Real-time earthquake monitoring and alerting system."""
     
-    def __init__(self, check_interval: int = 60):
+    # Seen IDs kept in memory; USGS IDs drop out of the 1-day monitoring
+    # window long before this many newer ones arrive
+    SEEN_CAPACITY = 10000
+    # How long seen IDs are kept in the state database
+    SEEN_RETENTION_DAYS = 7
+    # Never ask USGS for less than this, and request a little below the
+    # weakest zone so rounding or revised magnitudes aren't missed
+    FETCH_MIN_MAGNITUDE = 3.0
+    FETCH_MAGNITUDE_MARGIN = 0.2
+    
+    def __init__(self, check_interval: int = 60, fetcher: Optional[EarthquakeDataFetcher] = None):
         self.check_interval = check_interval  # seconds
         self.alert_zones: List[AlertZone] = []
         self.notification_handlers: List[NotificationHandler] = []
-        self.seen_earthquakes: set = set()
+        self.seen_earthquakes: OrderedDict = OrderedDict()  # LRU of seen IDs
         self.last_check: Optional[datetime] = None
         self.running = False
-        self.fetcher = EarthquakeDataFetcher()
-        self.data_file = "alert_data.json"
+        # A fetcher passed in may be shared, so only our own one is closed
+        self._owns_fetcher = fetcher is None
+        self.fetcher = fetcher if fetcher is not None else EarthquakeDataFetcher()
+        self.data_file = "alert_state.sqlite"
+        self.legacy_data_file = "alert_data.json"
+        self._zone_index: Optional[ZoneIndex] = None
+        self._unsaved_ids: List[str] = []
+        self._saved_check: Optional[datetime] = None
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()  # Checks may run on executor threads
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop_event: Optional[asyncio.Event] = None
         
         # Load previous state
         self._load_state()
@@ -161,92 +421,176 @@ class EarthquakeMonitor:
     def add_alert_zone(self, zone: AlertZone):
         """Add a new alert zone."""
         self.alert_zones.append(zone)
+        self._zone_index = None
         self._save_state()
     
     def add_notification_handler(self, handler: NotificationHandler):
         """Add a notification handler."""
         self.notification_handlers.append(handler)
     
+    def _mark_seen(self, eq_id: str):
+        """Record an earthquake ID, evicting the least recently seen past capacity."""
+        self.seen_earthquakes[eq_id] = None
+        self.seen_earthquakes.move_to_end(eq_id)
+        if len(self.seen_earthquakes) > self.SEEN_CAPACITY:
+            self.seen_earthquakes.popitem(last=False)
+    
+    def _open_db(self) -> sqlite3.Connection:
+        """Open the state database, creating its tables on first use."""
+        db = sqlite3.connect(self.data_file, check_same_thread=False)
+        # WAL lets other processes (e.g. the dashboard) read while we write
+        db.execute('PRAGMA journal_mode=WAL')
+        with db:
+            db.execute('CREATE TABLE IF NOT EXISTS seen (id TEXT PRIMARY KEY, ts REAL NOT NULL)')
+            db.execute('CREATE INDEX IF NOT EXISTS seen_ts ON seen (ts)')
+            db.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+        return db
+    
     def _load_state(self):
         """Load previous monitoring state."""
         try:
-            if os.path.exists(self.data_file):
-                with open(self.data_file, 'r') as f:
-                    data = json.load(f)
-                    self.seen_earthquakes = set(data.get('seen_earthquakes', []))
-                    if data.get('last_check'):
-                        self.last_check = datetime.fromisoformat(data['last_check'])
+            if not os.path.exists(self.data_file):
+                # Nothing saved yet; the database is created on the first save
+                if os.path.exists(self.legacy_data_file):
+                    self._import_legacy_state()
+                return
+            self._db = self._open_db()
+            cutoff = time.time() - self.SEEN_RETENTION_DAYS * 86400
+            rows = self._db.execute(
+                'SELECT id FROM seen WHERE ts > ? ORDER BY ts DESC LIMIT ?', (cutoff, self.SEEN_CAPACITY)
+            ).fetchall()
+            for (eq_id,) in reversed(rows):
+                self._mark_seen(eq_id)
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'last_check'").fetchone()
+            if row:
+                self.last_check = datetime.fromisoformat(row[0])
+            self._saved_check = self.last_check
+            
+            if not rows and row is None and os.path.exists(self.legacy_data_file):
+                self._import_legacy_state()
         except Exception as e:
             print(f"Warning: Could not load previous state: {e}")
     
+    def _import_legacy_state(self):
+        """Carry over state from the old alert_data.json file."""
+        with open(self.legacy_data_file, 'rb') as f:
+            data = _json.loads(f.read())
+        for eq_id in data.get('seen_earthquakes', []):
+            self._mark_seen(eq_id)
+            self._unsaved_ids.append(eq_id)
+        if data.get('last_check'):
+            self.last_check = datetime.fromisoformat(data['last_check'])
+        self._save_state()
+    
     def _save_state(self):
-        """Save current monitoring state."""
+        """Insert newly seen IDs and the last check time in one transaction."""
+        if not self._unsaved_ids and self.last_check == self._saved_check:
+            return
         try:
-            data = {
-                'seen_earthquakes': list(self.seen_earthquakes),
-                'last_check': self.last_check.isoformat() if self.last_check else None
-            }
-            with open(self.data_file, 'w') as f:
-                json.dump(data, f)
+            now = time.time()
+            with self._db_lock:
+                if self._db is None:
+                    self._db = self._open_db()
+                with self._db:
+                    self._db.executemany('INSERT OR IGNORE INTO seen (id, ts) VALUES (?, ?)',
+                                         [(eq_id, now) for eq_id in self._unsaved_ids])
+                    if self.last_check:
+                        self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('last_check', ?)",
+                                         (self.last_check.isoformat(),))
+                    self._db.execute('DELETE FROM seen WHERE ts < ?', (now - self.SEEN_RETENTION_DAYS * 86400,))
+            self._unsaved_ids = []
+            self._saved_check = self.last_check
         except Exception as e:
             print(f"Warning: Could not save state: {e}")
     
+    def _get_zone_index(self) -> ZoneIndex:
+        """Return the zone index, rebuilding it if the zone list has changed."""
+        if self._zone_index is None or self._zone_index.zones != tuple(self.alert_zones):
+            self._zone_index = ZoneIndex(self.alert_zones)
+        return self._zone_index
+    
+    def _fetch_min_magnitude(self) -> float:
+        """Magnitude floor for the USGS request, derived from the weakest zone."""
+        index = self._get_zone_index()
+        if not index.zones:
+            return self.FETCH_MIN_MAGNITUDE
+        return max(self.FETCH_MIN_MAGNITUDE, index.min_magnitude - self.FETCH_MAGNITUDE_MARGIN)
+    
     def check_for_earthquakes(self):
         """Check for new earthquakes and send alerts."""
         try:
             # Fetch recent earthquakes
             df = self.fetcher.fetch_earthquakes(
-                min_magnitude=3.0,  # Lower threshold for monitoring
+                min_magnitude=self._fetch_min_magnitude(),  # Nothing weaker can alert
                 days=1,  # Only check last day
-                limit=200
+                limit=200,
+                force_refresh=True  # Every tick must see the live feed
             )
             
             if df.empty:
                 return
             
             new_alerts = []
+            # One timestamp for the whole check, shared by its alerts
+            now = datetime.now()
             
-            for _, earthquake in df.iterrows():
-                eq_id = earthquake['id']
-                
-                # Skip if we've already processed this earthquake
-                if eq_id in self.seen_earthquakes:
-                    continue
-                
-                # Check if earthquake matches any alert zone
-                for zone in self.alert_zones:
-                    if zone.contains_earthquake(
-                        earthquake['latitude'], 
-                        earthquake['longitude'], 
-                        earthquake['magnitude']
-                    ):
-                        alert = EarthquakeAlert(
-                            earthquake_id=eq_id,
-                            magnitude=earthquake['magnitude'],
-                            location=earthquake['place'],
-                            latitude=earthquake['latitude'],
-                            longitude=earthquake['longitude'],
-                            depth=earthquake['depth'],
-                            time=earthquake['time'],
-                            zone_name=zone.name,
-                            alert_time=datetime.now(),
-                            tsunami_warning=earthquake['tsunami']
-                        )
-                        new_alerts.append(alert)
-                        break  # Only alert once per earthquake
+            # Skip earthquakes we've already processed, refreshing their LRU
+            # position since they're still inside the fetch window. Probing the
+            # dict per fetched ID is O(batch); Series.isin would rebuild a hash
+            # table of every seen ID on each check.
+            ids = df['id'].to_numpy()
+            seen = np.fromiter(map(self.seen_earthquakes.__contains__, ids), dtype=bool, count=len(ids))
+            for eq_id in ids[seen]:
+                self.seen_earthquakes.move_to_end(eq_id)
+            df = df[~seen]
+            
+            # Match every new earthquake against every zone in one pass;
+            # only the first matching zone alerts for each earthquake
+            zone_idx = self._get_zone_index().match(df)
+            
+            matched = np.flatnonzero(zone_idx >= 0)
+            if matched.size:
+                # Pull columns once instead of boxing a Series per matched row;
+                # .array keeps the times as Timestamps rather than datetime64
+                ids = df['id'].to_numpy()
+                mags = df['magnitude'].to_numpy()
+                places = df['place'].to_numpy()
+                lats = df['latitude'].to_numpy()
+                lons = df['longitude'].to_numpy()
+                depths = df['depth'].to_numpy()
+                times = df['time'].array
+                # Plain bools: numpy scalars don't survive JSON encoding
+                tsunamis = (df['tsunami'].to_numpy() != 0).tolist()
                 
-                # Mark as seen
-                self.seen_earthquakes.add(eq_id)
+                for i in matched:
+                    alert = EarthquakeAlert(
+                        earthquake_id=ids[i],
+                        magnitude=mags[i],
+                        location=places[i],
+                        latitude=lats[i],
+                        longitude=lons[i],
+                        depth=depths[i],
+                        time=times[i],
+                        zone_name=self.alert_zones[zone_idx[i]].name,
+                        alert_time=now,
+                        tsunami_warning=tsunamis[i]
+                    )
+                    new_alerts.append(alert)
+            
+            # Mark as seen
+            for eq_id in df['id']:
+                self._mark_seen(eq_id)
+                self._unsaved_ids.append(eq_id)
             
-            # Send notifications for new alerts
-            for alert in new_alerts:
+            # Send notifications for new alerts, one batch per handler
+            if new_alerts:
                 for handler in self.notification_handlers:
                     try:
-                        handler.send_alert(alert)
+                        handler.send_alerts(new_alerts)
                     except Exception as e:
                         print(f"Notification handler failed: {e}")
             
-            self.last_check = datetime.now()
+            self.last_check = now
             self._save_state()
             
             if new_alerts:
@@ -277,32 +621,75 @@ class EarthquakeMonitor:
         print(f"🔔 Check interval: {self.check_interval} seconds")
         print("Press Ctrl+C to stop monitoring\n")
         
-        def monitor_loop():
+        try:
+            asyncio.run(self.run())
+        except KeyboardInterrupt:
+            self.stop_monitoring()
+    
+    async def _tick(self):
+        """Run one check without blocking the event loop.
+        
+        The USGS request and the notification handlers do blocking I/O, so the
+        check runs in the loop's default executor while the loop stays free.
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.check_for_earthquakes)
+    
+    async def run(self):
+        """Check for earthquakes every ``check_interval`` seconds until stopped.
+        
+        Can be awaited on an existing event loop to embed the monitor in
+        another asyncio application.
+        """
+        self.running = True
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        try:
             while self.running:
                 try:
-                    self.check_for_earthquakes()
-                    time.sleep(self.check_interval)
-                except KeyboardInterrupt:
-                    self.stop_monitoring()
-                    break
+                    await self._tick()
                 except Exception as e:
                     print(f"Error in monitoring loop: {e}")
-                    time.sleep(self.check_interval)
-        
-        # Run in separate thread for CLI responsiveness
-        monitor_thread = threading.Thread(target=monitor_loop, daemon=True)
-        monitor_thread.start()
-        
-        try:
-            monitor_thread.join()
-        except KeyboardInterrupt:
-            self.stop_monitoring()
+                
+                # Sleep until the next check, waking early if stopped
+                try:
+                    await asyncio.wait_for(self._stop_event.wait(), timeout=self.check_interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._loop = None
+            self._stop_event = None
     
     def stop_monitoring(self):
         """Stop earthquake monitoring."""
         self.running = False
+        # May be called from another thread, so wake the loop thread-safely
+        if self._loop is not None and self._stop_event is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._stop_event.set)
+            except RuntimeError:
+                pass  # Loop already closed
+        # The fetcher stays open so the monitor can be started again
+        self._release()
         print("\n🛑 Earthquake monitoring stopped.")
     
+    def close(self):
+        """Release the handlers' connections, the state database and our own fetcher."""
+        self._release()
+        if self._owns_fetcher:
+            self.fetcher.close()
+    
+    def _release(self):
+        """Close notification handler connections and the state database."""
+        for handler in self.notification_handlers:
+            close = getattr(handler, 'close', None)
+            if close is not None:
+                close()
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+    
     def get_status(self) -> Dict[str, Any]:
         """Get monitoring status."""
         return {
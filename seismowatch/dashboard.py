@@ -1,26 +1,87 @@
-import json
+import asyncio
+import hashlib
+import sys
 import threading
 import time
 from datetime import datetime, timedelta
+import numpy as np
+import socketio
+import uvicorn
+from asgiref.wsgi import WsgiToAsgi
 from flask import Flask, render_template, jsonify, request
-from flask_socketio import SocketIO, emit
-import eventlet
+from jinja2 import ChoiceLoader, DictLoader
 
-from .earthquakes import EarthquakeDataFetcher, EarthquakeVisualizer
-from .alerts import EarthquakeMonitor, AlertZone, ConsoleNotificationHandler
+from .earthquakes import EarthquakeDataFetcher, EarthquakeVisualizer, earthquake_records
+from ._http import ORJSONProvider, compress_responses
+from .alerts import EarthquakeMonitor, AlertZone, ConsoleNotificationHandler, NotificationHandler
+from . import _json
 
-# Monkey patch for eventlet
-eventlet.monkey_patch()
+# How long the proxied USGS feed is served from memory before refetching
+FEED_TTL_SECONDS = 30
 
-class DashboardNotificationHandler:
+# Column order of the rows in the compact feed format
+FEED_COLUMNS = ['lat', 'lon', 'depth', 'mag', 'time', 'place', 'sig', 'id', 'tsunami']
+
+def compact_feed(geojson: bytes) -> bytes:
+    """Flatten USGS GeoJSON into ``{"cols": [...], "rows": [[...], ...]}``.
+    
+    Rows follow FEED_COLUMNS, which avoids the nested per-event objects the
+    browser would otherwise have to build while parsing.
+    """
+    features = _json.loads(geojson)['features']
+    rows = []
+    for feature in features:
+        props = feature['properties']
+        lon, lat, depth = feature['geometry']['coordinates'][:3]
+        rows.append([lat, lon, depth, props['mag'], props['time'], props['place'],
+                     props.get('sig'), feature['id'], props.get('tsunami', 0)])
+    return _json.dumps({'cols': FEED_COLUMNS, 'rows': rows})
+
+# Fields sent per earthquake by /api/recent_earthquakes and the live socket feed
+RECENT_EARTHQUAKE_FIELDS = ['id', 'magnitude', 'location', 'latitude', 'longitude',
+                            'depth', 'time', 'tsunami', 'significance']
+LIVE_EARTHQUAKE_FIELDS = ['magnitude', 'location', 'latitude', 'longitude', 'time']
+
+# Buckets reported by /api/stats, lower bound inclusive
+MAGNITUDE_BINS = [2.0, 3.0, 4.0, 5.0, 6.0, float('inf')]
+MAGNITUDE_LABELS = ['2.0-2.9', '3.0-3.9', '4.0-4.9', '5.0-5.9', '6.0+']
+
+class SocketIOJSON:
+    """``json`` stand-in for python-socketio that encodes with orjson when available.
+    
+    Socket.IO passes stdlib keyword arguments (``separators``) and expects
+    text back; the output is compact either way.
+    """
+    
+    @staticmethod
+    def dumps(obj, **kwargs) -> str:
+        return _json.dumps(obj).decode('utf-8')
+    
+    @staticmethod
+    def loads(data, **kwargs):
+        return _json.loads(data)
+
+class DashboardNotificationHandler(NotificationHandler):
     """Notification handler that sends alerts via WebSocket."""
     
-    def __init__(self, socketio):
-        self.socketio = socketio
+    def __init__(self, sio):
+        self.sio = sio
+        self.loop = None  # Event loop serving the ASGI app, set on startup
     
     def send_alert(self, alert):
         """Send alert via WebSocket to all connected clients."""
-        alert_data = {
+        return self.send_alerts([alert])
+    
+    def send_alerts(self, alerts):
+        """Broadcast a batch of alerts as one ``earthquake_alerts`` event.
+        
+        Called from the monitoring thread, so the emit is scheduled onto the
+        server's event loop instead of being awaited here.
+        """
+        if self.loop is None:
+            return False
+        
+        payload = [{
             'id': alert.earthquake_id,
             'magnitude': alert.magnitude,
             'location': alert.location,
@@ -31,11 +92,12 @@ class DashboardNotificationHandler:
             'zone_name': alert.zone_name,
             'alert_time': alert.alert_time.isoformat(),
             'tsunami_warning': alert.tsunami_warning
-        }
+        } for alert in alerts]
         
-        # Emit to all connected clients
-        self.socketio.emit('earthquake_alert', alert_data)
-        print(f"📡 Broadcasted alert: M{alert.magnitude} - {alert.location}")
+        # One frame to every connected client, however many alerts fired
+        asyncio.run_coroutine_threadsafe(self.sio.emit('earthquake_alerts', payload), self.loop)
+        sys.stdout.write(''.join(f"📡 Broadcasted alert: M{alert.magnitude} - {alert.location}\n"
+                                 for alert in alerts))
         return True
 
 class EarthquakeDashboard:
@@ -44,25 +106,47 @@ class EarthquakeDashboard:
     def __init__(self):
         self.app = Flask(__name__)
         self.app.config['SECRET_KEY'] = 'earthquake_dashboard_secret'
-        self.socketio = SocketIO(self.app, cors_allowed_origins="*", async_mode='eventlet')
+        self.app.json = ORJSONProvider(self.app)
+        compress_responses(self.app)
+        # Serve the built-in page from memory; a templates/dashboard.html
+        # file still takes precedence if one is provided
+        self.app.jinja_loader = ChoiceLoader([
+            self.app.jinja_loader,
+            DictLoader({'dashboard.html': DASHBOARD_HTML}),
+        ])
+        
+        # Socket.IO runs natively on asyncio; Flask routes are mounted behind it
+        self.sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins='*', json=SocketIOJSON)
+        self.asgi_app = socketio.ASGIApp(self.sio, other_asgi_app=WsgiToAsgi(self.app),
+                                         on_startup=self._on_startup,
+                                         on_shutdown=self._on_shutdown)
         
         self.fetcher = EarthquakeDataFetcher()
         self.visualizer = EarthquakeVisualizer()
         self.monitor = EarthquakeMonitor(check_interval=30)  # Check every 30 seconds
         
         # Add notification handler for WebSocket alerts
-        self.dashboard_handler = DashboardNotificationHandler(self.socketio)
+        self.dashboard_handler = DashboardNotificationHandler(self.sio)
         self.monitor.add_notification_handler(self.dashboard_handler)
         
         # Setup default alert zones
         self._setup_default_zones()
         
+        # The page is static, so render it once rather than per request
+        with self.app.app_context():
+            self._dashboard_page = render_template('dashboard.html').encode('utf-8')
+        
         # Setup routes and WebSocket handlers
         self._setup_routes()
         self._setup_websocket_handlers()
         
-        # Start monitoring in background
-        self.monitoring_thread = None
+        # Alert monitor task, started on the server's event loop
+        self.monitoring_task = None
+        
+        # Cached USGS feed shared by all clients of /api/feed
+        self._feed_lock = threading.Lock()
+        self._feed = {}  # format -> (body, etag)
+        self._feed_fetched_at = 0.0
     
     def _setup_default_zones(self):
         """Setup default earthquake monitoring zones."""
@@ -82,11 +166,17 @@ class EarthquakeDashboard:
         @self.app.route('/')
         def dashboard():
             """Main dashboard page."""
-            return render_template('dashboard.html')
+            response = self.app.response_class(self._dashboard_page, mimetype='text/html')
+            response.headers['Cache-Control'] = 'public, max-age=300'
+            return response
         
         @self.app.route('/api/recent_earthquakes')
         def recent_earthquakes():
-            """Get recent earthquake data."""
+            """Get recent earthquake data.
+            
+            Responses carry an ETag and short max-age, so browser reloads are
+            served from cache or answered with an empty 304.
+            """
             try:
                 days = request.args.get('days', 1, type=int)
                 min_mag = request.args.get('min_mag', 4.0, type=float)
@@ -99,28 +189,17 @@ class EarthquakeDashboard:
                 )
                 
                 if df.empty:
-                    return jsonify({'earthquakes': [], 'count': 0})
+                    return self._cacheable(jsonify({'earthquakes': [], 'count': 0}))
                 
-                earthquakes = []
-                for _, eq in df.iterrows():
-                    earthquakes.append({
-                        'id': eq['id'],
-                        'magnitude': eq['magnitude'],
-                        'location': eq['place'],
-                        'latitude': eq['latitude'],
-                        'longitude': eq['longitude'],
-                        'depth': eq['depth'],
-                        'time': eq['time'].isoformat(),
-                        'tsunami': eq['tsunami'],
-                        'significance': eq['significance']
-                    })
+                earthquakes = earthquake_records(df, RECENT_EARTHQUAKE_FIELDS)
+                magnitude = df['magnitude'].agg(['max', 'mean'])
                 
-                return jsonify({
+                return self._cacheable(jsonify({
                     'earthquakes': earthquakes,
                     'count': len(earthquakes),
-                    'max_magnitude': float(df['magnitude'].max()),
-                    'avg_magnitude': float(df['magnitude'].mean())
-                })
+                    'max_magnitude': magnitude['max'],
+                    'avg_magnitude': magnitude['mean']
+                }))
                 
             except Exception as e:
                 return jsonify({'error': str(e)}), 500
@@ -129,23 +208,23 @@ class EarthquakeDashboard:
         def earthquake_stats():
             """Get earthquake statistics."""
             try:
-                df = self.fetcher.fetch_earthquakes(min_magnitude=2.0, days=7, limit=1000)
+                # Kept current incrementally instead of refetching the whole week
+                df = self.fetcher.fetch_rolling(min_magnitude=2.0, days=7, limit=1000)
                 
                 if df.empty:
                     return jsonify({'error': 'No data available'})
                 
+                magnitude = df['magnitude'].agg(['mean', 'max'])
+                # One binning pass instead of a boolean mask per bucket
+                counts, _ = np.histogram(df['magnitude'].to_numpy(), bins=MAGNITUDE_BINS)
+                cutoff = np.datetime64(datetime.now() - timedelta(hours=24))
+                
                 stats = {
                     'total_earthquakes': len(df),
-                    'avg_magnitude': float(df['magnitude'].mean()),
-                    'max_magnitude': float(df['magnitude'].max()),
-                    'recent_24h': len(df[df['time'] > datetime.now() - timedelta(hours=24)]),
-                    'magnitude_distribution': {
-                        '2.0-2.9': len(df[(df['magnitude'] >= 2.0) & (df['magnitude'] < 3.0)]),
-                        '3.0-3.9': len(df[(df['magnitude'] >= 3.0) & (df['magnitude'] < 4.0)]),
-                        '4.0-4.9': len(df[(df['magnitude'] >= 4.0) & (df['magnitude'] < 5.0)]),
-                        '5.0-5.9': len(df[(df['magnitude'] >= 5.0) & (df['magnitude'] < 6.0)]),
-                        '6.0+': len(df[df['magnitude'] >= 6.0])
-                    }
+                    'avg_magnitude': magnitude['mean'],
+                    'max_magnitude': magnitude['max'],
+                    'recent_24h': np.count_nonzero(df['time'].to_numpy() > cutoff),
+                    'magnitude_distribution': dict(zip(MAGNITUDE_LABELS, counts.tolist()))
                 }
                 
                 return jsonify(stats)
@@ -153,6 +232,28 @@ class EarthquakeDashboard:
             except Exception as e:
                 return jsonify({'error': str(e)}), 500
         
+        @self.app.route('/api/feed')
+        def earthquake_feed():
+            """Proxy the last day of M4+ USGS GeoJSON through a shared cache.
+            
+            ``?format=compact`` returns flat rows instead of GeoJSON features.
+            """
+            feed_format = 'compact' if request.args.get('format') == 'compact' else 'geojson'
+            try:
+                body, etag = self._get_feed(feed_format)
+            except Exception as e:
+                return jsonify({'error': str(e)}), 502
+            
+            if request.if_none_match.contains_weak(etag):
+                response = self.app.response_class(status=304)
+            else:
+                response = self.app.response_class(body, mimetype='application/json')
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = (
+                f'public, max-age={FEED_TTL_SECONDS}, stale-while-revalidate={FEED_TTL_SECONDS * 2}'
+            )
+            return response
+        
         @self.app.route('/api/alert_zones')
         def get_alert_zones():
             """Get configured alert zones."""
@@ -170,69 +271,81 @@ class EarthquakeDashboard:
     def _setup_websocket_handlers(self):
         """Setup WebSocket event handlers."""
         
-        @self.socketio.on('connect')
-        def handle_connect():
+        @self.sio.on('connect')
+        async def handle_connect(sid, environ):
             """Handle client connection."""
-            print(f"🔌 Client connected: {request.sid}")
-            emit('connected', {'message': 'Connected to earthquake dashboard'})
+            print(f"🔌 Client connected: {sid}")
+            await self.sio.emit('connected', {'message': 'Connected to earthquake dashboard'}, to=sid)
         
-        @self.socketio.on('disconnect')
-        def handle_disconnect():
+        @self.sio.on('disconnect')
+        async def handle_disconnect(sid, *args):
             """Handle client disconnection."""
-            print(f"🔌 Client disconnected: {request.sid}")
+            print(f"🔌 Client disconnected: {sid}")
         
-        @self.socketio.on('request_recent_data')
-        def handle_recent_data_request():
+        @self.sio.on('request_recent_data')
+        async def handle_recent_data_request(sid, *args):
             """Send recent earthquake data to client."""
             try:
-                df = self.fetcher.fetch_earthquakes(min_magnitude=4.0, days=1, limit=50)
-                earthquakes = []
-                
-                for _, eq in df.iterrows():
-                    earthquakes.append({
-                        'magnitude': eq['magnitude'],
-                        'location': eq['place'],
-                        'latitude': eq['latitude'],
-                        'longitude': eq['longitude'],
-                        'time': eq['time'].isoformat()
-                    })
+                df = await self.fetcher.fetch_earthquakes_async(min_magnitude=4.0, days=1, limit=50)
+                earthquakes = earthquake_records(df, LIVE_EARTHQUAKE_FIELDS)
                 
-                emit('recent_earthquakes', {'earthquakes': earthquakes})
+                await self.sio.emit('recent_earthquakes', {'earthquakes': earthquakes}, to=sid)
                 
             except Exception as e:
-                emit('error', {'message': str(e)})
+                await self.sio.emit('error', {'message': str(e)}, to=sid)
+    
+    def _cacheable(self, response):
+        """Add a content ETag and short max-age, answering 304 on a match."""
+        response.headers['Cache-Control'] = f'public, max-age={FEED_TTL_SECONDS}'
+        response.add_etag()
+        return response.make_conditional(request)
+    
+    def _get_feed(self, feed_format='geojson'):
+        """Return the cached feed body and ETag, refetching once the TTL expires."""
+        with self._feed_lock:
+            if not self._feed or time.monotonic() - self._feed_fetched_at >= FEED_TTL_SECONDS:
+                geojson = self.fetcher.fetch_geojson(min_magnitude=4.0, days=1, limit=1000)
+                self._feed = {}
+                for name, body in (('geojson', geojson), ('compact', compact_feed(geojson))):
+                    self._feed[name] = (body, hashlib.blake2b(body, digest_size=16).hexdigest())
+                self._feed_fetched_at = time.monotonic()
+            return self._feed[feed_format]
+    
+    def _on_startup(self):
+        """Remember the serving event loop and start the alert monitor on it."""
+        self.dashboard_handler.loop = asyncio.get_running_loop()
+        self.start_monitoring()
+    
+    def _on_shutdown(self):
+        """Stop the alert monitor with the server and release its connections."""
+        if self.monitoring_task is not None:
+            self.monitor.stop_monitoring()
+        self.monitor.close()
     
     def start_monitoring(self):
-        """Start earthquake monitoring in background thread."""
-        if self.monitoring_thread and self.monitoring_thread.is_alive():
+        """Start earthquake monitoring as a task on the server's event loop.
+        
+        Must be called from the running loop (the ASGI startup hook does this).
+        Checks run in the loop's executor, so the loop stays free for WebSockets.
+        """
+        if self.monitoring_task and not self.monitoring_task.done():
             print("Monitoring already running!")
             return
         
-        def monitor_loop():
-            """Background monitoring loop."""
-            print("🔍 Starting background earthquake monitoring...")
-            while True:
-                try:
-                    self.monitor.check_for_earthquakes()
-                    time.sleep(30)  # Check every 30 seconds
-                except Exception as e:
-                    print(f"Error in monitoring loop: {e}")
-                    time.sleep(30)
-        
-        self.monitoring_thread = threading.Thread(target=monitor_loop, daemon=True)
-        self.monitoring_thread.start()
+        print("🔍 Starting background earthquake monitoring...")
+        self.monitoring_task = self.sio.start_background_task(self.monitor.run)
     
     def run(self, host='127.0.0.1', port=5000, debug=False):
-        """Run the dashboard application."""
-        # Start monitoring
-        self.start_monitoring()
+        """Run the dashboard application.
         
+        Monitoring starts with the server via the ASGI startup hook.
+        """
         print(f"🌐 Starting Earthquake Dashboard on http://{host}:{port}")
         print("🚨 Real-time earthquake monitoring active!")
         print("📡 WebSocket live updates enabled")
         
-        # Run with eventlet for WebSocket support
-        self.socketio.run(self.app, host=host, port=port, debug=debug)
+        # Single worker: the alert monitor runs in-process and owns its state file
+        uvicorn.run(self.asgi_app, host=host, port=port, log_level='debug' if debug else 'info')
 
 # Create HTML template
 DASHBOARD_HTML = '''<!DOCTYPE html>
@@ -242,6 +355,7 @@ DASHBOARD_HTML = '''<!DOCTYPE html>
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>🌍 Live Earthquake Dashboard</title>
     <script src="https://cdnjs.cloudflare.com/ajax/libs/socket.io/4.6.1/socket.io.js"></script>
+    <link rel="preconnect" href="https://tile.openstreetmap.org">
     <script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
     <link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css" />
     <style>
@@ -313,8 +427,15 @@ DASHBOARD_HTML = '''<!DOCTYPE html>
 
     <script>
         // Initialize map
-        const map = L.map('map').setView([20, 0], 2);
-        L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
+        // Canvas draws every marker in one paint instead of one SVG node each
+        const map = L.map('map', { preferCanvas: true }).setView([20, 0], 2);
+        // One HTTP/2 host (no a/b/c shards); skip tiles for in-between zoom levels,
+        // but load while panning and keep a ring of off-screen tiles so pans aren't blank
+        L.tileLayer('https://tile.openstreetmap.org/{z}/{x}/{y}.png', {
+            maxZoom: 19,
+            updateWhenZooming: false,
+            updateWhenIdle: false,
+            keepBuffer: 4,
             attribution: '© OpenStreetMap contributors'
         }).addTo(map);
 
@@ -335,8 +456,15 @@ DASHBOARD_HTML = '''<!DOCTYPE html>
             statusEl.className = 'connection-status disconnected';
         });
         
-        // Handle earthquake alerts
-        socket.on('earthquake_alert', (alert) => {
+        // Handle earthquake alerts, delivered in batches per monitor check
+        socket.on('earthquake_alerts', (alerts) => {
+            alerts.forEach(showAlert);
+            
+            // Play alert sound (optional)
+            playAlertSound();
+        });
+        
+        function showAlert(alert) {
             console.log('New earthquake alert:', alert);
             
             // Add to map
@@ -359,10 +487,7 @@ DASHBOARD_HTML = '''<!DOCTYPE html>
             
             // Add to alert feed
             addAlertToFeed(alert);
-            
-            // Play alert sound (optional)
-            playAlertSound();
-        });
+        }
         
         function getMagnitudeColor(magnitude) {
             if (magnitude >= 7) return '#4B0082';
@@ -418,24 +543,20 @@ DASHBOARD_HTML = '''<!DOCTYPE html>
             .then(response => response.json())
             .then(data => {
                 if (data.earthquakes) {
-                    data.earthquakes.forEach(eq => {
-                        const color = getMagnitudeColor(eq.magnitude);
-                        const marker = L.circleMarker([eq.latitude, eq.longitude], {
-                            radius: Math.max(5, eq.magnitude * 3),
-                            fillColor: color,
-                            color: '#000',
-                            weight: 1,
-                            opacity: 0.7,
-                            fillOpacity: 0.6
-                        }).addTo(map);
-                        
-                        marker.bindPopup(`
-                            <b>M${eq.magnitude} Earthquake</b><br>
-                            ${eq.location}<br>
-                            ${new Date(eq.time).toLocaleString()}<br>
-                            Depth: ${eq.depth.toFixed(1)} km
-                        `);
-                    });
+                    const markers = data.earthquakes.map(eq => L.circleMarker([eq.latitude, eq.longitude], {
+                        radius: Math.max(5, eq.magnitude * 3),
+                        fillColor: getMagnitudeColor(eq.magnitude),
+                        color: '#000',
+                        weight: 1,
+                        opacity: 0.7,
+                        fillOpacity: 0.6
+                    }).bindPopup(`
+                        <b>M${eq.magnitude} Earthquake</b><br>
+                        ${eq.location}<br>
+                        ${new Date(eq.time).toLocaleString()}<br>
+                        Depth: ${eq.depth.toFixed(1)} km
+                    `));
+                    L.layerGroup(markers).addTo(map);
                     
                     // Update stats
                     document.getElementById('totalEarthquakes').textContent = data.count;
@@ -452,15 +573,6 @@ def create_dashboard():
     return EarthquakeDashboard()
 
 if __name__ == '__main__':
-    # Create templates directory
-    import os
-    templates_dir = os.path.join(os.path.dirname(__file__), 'templates')
-    os.makedirs(templates_dir, exist_ok=True)
-    
-    # Write template file
-    with open(os.path.join(templates_dir, 'dashboard.html'), 'w') as f:
-        f.write(DASHBOARD_HTML)
-    
     # Run dashboard
     dashboard = create_dashboard()
     dashboard.run(debug=True)
\ No newline at end of file
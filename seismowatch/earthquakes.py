@@ -1,63 +1,408 @@
 import requests
+from requests.adapters import HTTPAdapter
+import numpy as np
 import pandas as pd
 import folium
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any
-import json
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import _json
+
+def earthquake_records(df: pd.DataFrame, fields: List[str],
+                       time_format: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Convert fetched earthquakes to JSON-ready dicts column-wise, without iterrows.
+    
+    ``place`` is exposed as ``location``; times become ISO 8601 strings, or
+    ``time_format`` strftime strings when given.
+    """
+    if df.empty:
+        return []
+    out = df.rename(columns={'place': 'location'})
+    if time_format is None:
+        out['time'] = out['time'].map(pd.Timestamp.isoformat)
+    else:
+        out['time'] = out['time'].dt.strftime(time_format)
+    return out[fields].to_dict(orient='records')
+
+def magnitude_bins(magnitudes, thresholds) -> np.ndarray:
+    """Index of the band each magnitude falls in, given ascending band edges.
+    
+    Missing (NaN) magnitudes land in the lowest band, as the old if/elif
+    lookups did, rather than past every threshold.
+    """
+    mag = np.asarray(magnitudes, dtype=float)
+    return np.searchsorted(thresholds, np.where(np.isnan(mag), -np.inf, mag), side='right')
+
+def _usgs_time(moment: datetime) -> str:
+    """Format a USGS query bound, floored to the minute.
+    
+    Polls within the same minute then request the same URL, so conditional
+    requests and any HTTP cache in front of USGS can match them.
+    """
+    return moment.strftime('%Y-%m-%dT%H:%M:00')
+
+class _InFlightFetch:
+    """A USGS fetch in progress that concurrent identical callers wait on."""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.df = pd.DataFrame()
+
+class _RollingWindow:
+    """Every event of one (min_magnitude, days) window, kept current incrementally."""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.df = pd.DataFrame()
+        self.synced_at: Optional[datetime] = None  # UTC start of the last successful sync
+        self.refreshed = 0.0  # time.monotonic() of the last successful sync
 
 class EarthquakeDataFetcher:
     """Fetches real-time earthquake data from USGS API."""
     
-    def __init__(self):
+    # Large multi-day queries are split into one request per day, fetched
+    # concurrently; the worker cap keeps us polite to USGS
+    SPLIT_MIN_LIMIT = 500
+    MAX_PARALLEL_FETCHES = 7
+    # Most query shapes whose last body is kept for conditional requests
+    MAX_VALIDATED_QUERIES = 32
+    # Rolling windows: page size for syncs (the USGS maximum), overlap between
+    # syncs so events updated mid-request aren't missed, and how many to keep
+    ROLLING_PAGE_LIMIT = 20000
+    ROLLING_SYNC_OVERLAP = timedelta(minutes=1)
+    MAX_ROLLING_WINDOWS = 4
+    
+    def __init__(self, cache_ttl: float = 60):
         self.base_url = "https://earthquake.usgs.gov/fdsnws/event/1/query"
+        # One keep-alive session so repeated polls skip the TCP/TLS handshake;
+        # the pool is sized so concurrent dashboard requests keep their sockets
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=16))
+        # Parsed results keyed by (min_magnitude, days, limit), kept for cache_ttl seconds
+        self.cache_ttl = cache_ttl
+        self._cache: Dict[tuple, tuple] = {}
+        self._cache_lock = threading.Lock()
+        self._inflight: Dict[tuple, _InFlightFetch] = {}
+        # Last request params, ETag, Last-Modified and body per rolling query,
+        # so an unchanged feed comes back as an empty 304 instead of the full payload
+        self._validators: Dict[tuple, tuple] = {}
+        self._rolling: Dict[tuple, _RollingWindow] = {}
+    
+    def close(self):
+        """Close the pooled HTTP connections."""
+        self.session.close()
         
-    def fetch_earthquakes(self, 
-                         min_magnitude: float = 4.0,
-                         days: int = 7,
-                         limit: int = 100) -> pd.DataFrame:
-        """Fetch earthquake data from USGS API."""
+    def fetch_geojson(self,
+                      min_magnitude: float = 4.0,
+                      days: int = 7,
+                      limit: int = 100,
+                      end_time: Optional[datetime] = None) -> bytes:
+        """Fetch the raw USGS GeoJSON payload, raising on HTTP errors.
         
-        end_time = datetime.utcnow()
+        The window covers ``days`` days up to ``end_time`` (UTC, default now).
+        Rolling queries (no ``end_time``) are revalidated with the previous
+        response's ETag/Last-Modified while they still map to the same URL
+        (bounds are floored to the minute), reusing its body on a 304.
+        """
+        
+        key = None
+        if end_time is None:
+            key = (min_magnitude, days, limit)
+            end_time = datetime.utcnow()
         start_time = end_time - timedelta(days=days)
         
         params = {
             'format': 'geojson',
-            'starttime': start_time.strftime('%Y-%m-%d'),
-            'endtime': end_time.strftime('%Y-%m-%d'),
+            'starttime': _usgs_time(start_time),
+            'endtime': _usgs_time(end_time),
             'minmagnitude': min_magnitude,
             'limit': limit,
             'orderby': 'magnitude'
         }
         
-        try:
-            response = requests.get(self.base_url, params=params, timeout=30)
+        previous = self._validators.get(key) if key is not None else None
+        if previous is not None and previous[0] != params:
+            # Validators only apply to the exact URL they came with; once the
+            # window has moved on to the next minute they can't match
+            previous = None
+        headers = {}
+        if previous is not None:
+            _, etag, last_modified, _ = previous
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        
+        status, body, response_headers = self._query(params, headers)
+        if status == 304 and previous is not None:
+            return previous[3]
+        etag = response_headers.get('ETag')
+        last_modified = response_headers.get('Last-Modified')
+        
+        if key is not None and (etag or last_modified):
+            with self._cache_lock:
+                self._validators.pop(key, None)
+                if len(self._validators) >= self.MAX_VALIDATED_QUERIES:
+                    # Drop the least recently refreshed query
+                    del self._validators[next(iter(self._validators))]
+                self._validators[key] = (params, etag, last_modified, body)
+        return body
+    
+    def _query(self, params: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> tuple:
+        """GET the USGS query endpoint, returning (status, body, headers).
+        
+        Raises on HTTP errors. A 304 comes back with an empty body.
+        """
+        # Read the (gzip-decoded) body in one call rather than requests'
+        # default 10 KB chunks; closing the response returns the socket to the pool
+        with self.session.get(self.base_url, params=params, headers=headers,
+                              timeout=30, stream=True) as response:
             response.raise_for_status()
-            data = response.json()
+            body = b'' if response.status_code == 304 else response.raw.read(decode_content=True)
+            return response.status_code, body, response.headers
+        
+    def fetch_earthquakes(self, 
+                         min_magnitude: float = 4.0,
+                         days: int = 7,
+                         limit: int = 100,
+                         force_refresh: bool = False) -> pd.DataFrame:
+        """Fetch earthquake data from USGS API.
+        
+        Results are served from memory for ``cache_ttl`` seconds unless
+        ``force_refresh`` is set. Concurrent calls for the same query share a
+        single request. Callers get their own copy of the frame.
+        """
+        key = (min_magnitude, days, limit)
+        with self._cache_lock:
+            cached = None if force_refresh else self._fresh_entry(key)
+            if cached is not None:
+                return cached.copy()
             
-            earthquakes = []
-            for feature in data['features']:
-                props = feature['properties']
-                coords = feature['geometry']['coordinates']
-                
-                earthquakes.append({
-                    'id': feature['id'],
-                    'magnitude': props['mag'],
-                    'place': props['place'],
-                    'time': datetime.fromtimestamp(props['time'] / 1000),
-                    'latitude': coords[1],
-                    'longitude': coords[0],
-                    'depth': coords[2],
-                    'url': props['url'],
-                    'tsunami': props['tsunami'],
-                    'felt': props.get('felt', 0),
-                    'significance': props.get('sig', 0)
-                })
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _InFlightFetch()
+        
+        if not leader:
+            flight.done.wait()
+            return flight.df.copy()
+        
+        try:
+            flight.df = self._fetch_dataframe(key)
+        finally:
+            with self._cache_lock:
+                del self._inflight[key]
+            flight.done.set()
+        return flight.df.copy()
+    
+    async def fetch_earthquakes_async(self,
+                                      min_magnitude: float = 4.0,
+                                      days: int = 7,
+                                      limit: int = 100,
+                                      force_refresh: bool = False) -> pd.DataFrame:
+        """``fetch_earthquakes`` for event-loop callers.
+        
+        Cache hits are answered inline; a USGS fetch runs in the loop's default
+        executor so the loop keeps serving other clients meanwhile, and
+        concurrent callers still share one upstream request.
+        """
+        if not force_refresh:
+            with self._cache_lock:
+                cached = self._fresh_entry((min_magnitude, days, limit))
+            if cached is not None:
+                return cached.copy()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, lambda: self.fetch_earthquakes(min_magnitude, days, limit, force_refresh)
+        )
+    
+    def _fresh_entry(self, key) -> Optional[pd.DataFrame]:
+        """The cached frame for ``key`` if younger than ``cache_ttl``; call with the cache lock held."""
+        entry = self._cache.get(key)
+        if entry is not None and time.monotonic() - entry[0] < self.cache_ttl:
+            return entry[1]
+        return None
+    
+    def fetch_rolling(self,
+                      min_magnitude: float = 4.0,
+                      days: int = 7,
+                      limit: int = 100,
+                      force_refresh: bool = False) -> pd.DataFrame:
+        """Return the top ``limit`` quakes by magnitude from a rolling window.
+        
+        Same result shape as ``fetch_earthquakes``, but the window is kept in
+        memory: the first call downloads it whole, later calls (at most once
+        per ``cache_ttl`` unless ``force_refresh``) ask USGS only for events
+        updated since the previous sync, upsert them by id and drop rows that
+        have aged out. If a sync fails the last good window is served.
+        """
+        key = (min_magnitude, days)
+        with self._cache_lock:
+            window = self._rolling.get(key)
+            if window is None:
+                if len(self._rolling) >= self.MAX_ROLLING_WINDOWS:
+                    del self._rolling[next(iter(self._rolling))]
+                window = self._rolling[key] = _RollingWindow()
+        
+        with window.lock:
+            if (force_refresh or window.synced_at is None
+                    or time.monotonic() - window.refreshed >= self.cache_ttl):
+                self._sync_window(window, min_magnitude, days)
+            df = window.df
+        
+        if df.empty:
+            return pd.DataFrame()
+        return df.sort_values('magnitude', ascending=False, kind='stable').head(limit).reset_index(drop=True)
+    
+    def _sync_window(self, window: _RollingWindow, min_magnitude: float, days: int):
+        """Merge events updated since the last sync into ``window``."""
+        sync_start = datetime.utcnow()
+        params = {
+            'format': 'geojson',
+            'starttime': _usgs_time(sync_start - timedelta(days=days)),
+            'minmagnitude': min_magnitude,
+            'limit': self.ROLLING_PAGE_LIMIT,
+            'orderby': 'time'
+        }
+        if window.synced_at is not None:
+            params['updatedafter'] = _usgs_time(window.synced_at - self.ROLLING_SYNC_OVERLAP)
+        
+        try:
+            updates = self._parse_geojson(self._query(params)[1])
+        except (requests.RequestException, ValueError) as e:
+            print(f"Error fetching earthquake data: {e}")
+            return
+        
+        frames = [df for df in (window.df, updates) if not df.empty]
+        if frames:
+            # Later rows win, so revised magnitudes/locations replace the old ones
+            df = pd.concat(frames, ignore_index=True).drop_duplicates('id', keep='last')
+            df = df[df['time'] >= datetime.now() - timedelta(days=days)].reset_index(drop=True)
+        else:
+            df = pd.DataFrame()
+        
+        window.df = df
+        window.synced_at = sync_start
+        window.refreshed = time.monotonic()
+    
+    def _fetch_dataframe(self, key: tuple) -> pd.DataFrame:
+        """Fetch and parse one query, caching successful results."""
+        min_magnitude, days, limit = key
+        try:
+            if days > 1 and limit >= self.SPLIT_MIN_LIMIT:
+                df = self._fetch_split_by_day(min_magnitude, days, limit)
+            else:
+                df = self._parse_geojson(self.fetch_geojson(min_magnitude, days, limit))
             
-            return pd.DataFrame(earthquakes)
+            now = time.monotonic()
+            with self._cache_lock:
+                # Drop expired entries so odd parameter combinations don't pile up
+                self._cache = {k: v for k, v in self._cache.items() if now - v[0] < self.cache_ttl}
+                self._cache[key] = (now, df)
+            return df
             
-        except requests.RequestException as e:
+        except (requests.RequestException, ValueError) as e:
             print(f"Error fetching earthquake data: {e}")
             return pd.DataFrame()
+    
+    def _fetch_split_by_day(self, min_magnitude: float, days: int, limit: int) -> pd.DataFrame:
+        """Fetch one request per day in parallel and keep the overall top ``limit``.
+        
+        Each day first asks for only its even share of ``limit``, so the usual
+        transfer stays near that of the single query this replaces. A day that
+        came back full may be hiding quakes no stronger than its weakest row;
+        only when that row reaches the merged top ``limit`` is the day fetched
+        again with the full ``limit``, so the result still matches one query.
+        The CLI (``fetch --days N --limit 500+``) is the main caller this serves.
+        """
+        end_time = datetime.utcnow()
+        window_ends = [end_time - timedelta(days=day) for day in range(days)]
+        per_day = -(-limit // days)
+        
+        def fetch_days(ends, day_limit):
+            with ThreadPoolExecutor(max_workers=min(len(ends), self.MAX_PARALLEL_FETCHES)) as pool:
+                return list(pool.map(
+                    lambda window_end: self._parse_geojson(
+                        self.fetch_geojson(min_magnitude, 1, day_limit, end_time=window_end)),
+                    ends
+                ))
+        
+        day_frames = fetch_days(window_ends, per_day)
+        if per_day < limit:
+            merged = [df['magnitude'] for df in day_frames if not df.empty]
+            magnitudes = pd.concat(merged).nlargest(limit) if merged else pd.Series(dtype=float)
+            cutoff = magnitudes.iloc[-1] if len(magnitudes) >= limit else -np.inf
+            truncated = [day for day, df in enumerate(day_frames)
+                         if len(df) >= per_day and df['magnitude'].min() >= cutoff]
+            if truncated:
+                refetched = fetch_days([window_ends[day] for day in truncated], limit)
+                for day, df in zip(truncated, refetched):
+                    day_frames[day] = df
+        
+        frames = [df for df in day_frames if not df.empty]
+        if not frames:
+            return pd.DataFrame()
+        # Window edges are inclusive, so an event on a boundary can show up twice
+        df = pd.concat(frames, ignore_index=True).drop_duplicates('id')
+        return df.sort_values('magnitude', ascending=False, kind='stable').head(limit).reset_index(drop=True)
+    
+    @staticmethod
+    def _parse_geojson(payload: bytes) -> pd.DataFrame:
+        """Parse a USGS GeoJSON payload into a DataFrame."""
+        # Gather plain column lists in one pass and build the frame from
+        # them, rather than a dict per row; features are streamed when ijson
+        # is installed so the parsed document never sits in memory whole
+        ids, mags, places, times, urls, tsunamis, felts, sigs, coords = ([] for _ in range(9))
+        for feature in _json.iter_array(payload, 'features'):
+            props = feature['properties']
+            ids.append(feature['id'])
+            mags.append(props['mag'])
+            places.append(props['place'])
+            times.append(datetime.fromtimestamp(props['time'] / 1000))
+            urls.append(props['url'])
+            tsunamis.append(props['tsunami'] or 0)  # null means no flag was issued
+            felts.append(props.get('felt', 0))
+            sigs.append(props.get('sig', 0))
+            coords.append(feature['geometry']['coordinates'])
+        if not ids:
+            return pd.DataFrame()
+        coords = np.array(coords, dtype=float)
+        
+        return pd.DataFrame({
+            'id': ids,
+            'magnitude': mags,
+            'place': places,
+            'time': times,
+            'latitude': coords[:, 1],
+            'longitude': coords[:, 0],
+            'depth': coords[:, 2],
+            'url': urls,
+            # Flags and scores fit in narrow integers; coordinates and
+            # magnitudes stay float64 so threshold comparisons are exact
+            'tsunami': np.array(tsunamis, dtype=np.int8),
+            'felt': felts,
+            'significance': pd.to_numeric(sigs, downcast='integer')
+        })
+
+# Static map legend, shared by every map
+_LEGEND_HTML = """
+<div style='position: fixed; 
+            bottom: 50px; left: 50px; width: 150px; height: 120px; 
+            background-color: white; border:2px solid grey; z-index:9999; 
+            font-size:14px; padding: 10px'>
+<p><b>Earthquake Magnitude</b></p>
+<p><i class="fa fa-circle" style="color:#FFD700"></i> 4.0 - 4.9</p>
+<p><i class="fa fa-circle" style="color:#FF8C00"></i> 5.0 - 5.9</p>
+<p><i class="fa fa-circle" style="color:#FF4500"></i> 6.0 - 6.9</p>
+<p><i class="fa fa-circle" style="color:#DC143C"></i> 7.0 - 7.9</p>
+<p><i class="fa fa-circle" style="color:#8B0000"></i> 8.0 - 8.9</p>
+<p><i class="fa fa-circle" style="color:#4B0082"></i> 9.0+</p>
+</div>
+"""
 
 class EarthquakeVisualizer:
     """Creates visualizations for earthquake data."""
@@ -71,21 +416,23 @@ class EarthquakeVisualizer:
             8.0: '#8B0000',  # Dark Red
             9.0: '#4B0082'   # Indigo
         }
+        # Lookup table for colors_for: the lowest color covers everything below
+        # the second threshold
+        thresholds = sorted(self.magnitude_colors)
+        self._mag_bins = np.array(thresholds[1:])
+        self._mag_lut = np.array([self.magnitude_colors[t] for t in thresholds])
+    
+    def colors_for(self, magnitudes) -> np.ndarray:
+        """Return the color for each magnitude in one vectorized lookup."""
+        return self._mag_lut[magnitude_bins(magnitudes, self._mag_bins)]
+    
+    def radii_for(self, magnitudes) -> np.ndarray:
+        """Return the circle radius for each magnitude; missing ones get the minimum."""
+        return np.fmax(5, np.asarray(magnitudes, dtype=float) * 3)
     
     def get_color_by_magnitude(self, magnitude: float) -> str:
         """Return color based on earthquake magnitude."""
-        if magnitude >= 9.0:
-            return self.magnitude_colors[9.0]
-        elif magnitude >= 8.0:
-            return self.magnitude_colors[8.0]
-        elif magnitude >= 7.0:
-            return self.magnitude_colors[7.0]
-        elif magnitude >= 6.0:
-            return self.magnitude_colors[6.0]
-        elif magnitude >= 5.0:
-            return self.magnitude_colors[5.0]
-        else:
-            return self.magnitude_colors[4.0]
+        return str(self.colors_for([magnitude])[0])
     
     def get_radius_by_magnitude(self, magnitude: float) -> float:
         """Return circle radius based on magnitude."""
@@ -111,30 +458,19 @@ class EarthquakeVisualizer:
             tiles='OpenStreetMap'
         )
         
-        # Add earthquake markers
-        for _, quake in df.iterrows():
-            color = self.get_color_by_magnitude(quake['magnitude'])
-            radius = self.get_radius_by_magnitude(quake['magnitude'])
-            
-            popup_text = f"""
-            <b>Magnitude: {quake['magnitude']}</b><br>
-            Location: {quake['place']}<br>
-            Time: {quake['time'].strftime('%Y-%m-%d %H:%M:%S')}<br>
-            Depth: {quake['depth']:.1f} km<br>
-            Significance: {quake['significance']}<br>
-            {"🌊 Tsunami Warning" if quake['tsunami'] else ""}
-            """
-            
-            folium.CircleMarker(
-                location=[quake['latitude'], quake['longitude']],
-                radius=radius,
-                popup=folium.Popup(popup_text, max_width=300),
-                color='black',
-                weight=1,
-                fillColor=color,
-                fillOpacity=0.7,
-                tooltip=f"M{quake['magnitude']} - {quake['place']}"
-            ).add_to(m)
+        # Add all earthquakes as one GeoJSON layer: a single template render
+        # and one Leaflet layer instead of a CircleMarker element per row
+        folium.GeoJson(
+            self._earthquake_geojson(df),
+            marker=folium.CircleMarker(color='black', weight=1, fill=True, fill_opacity=0.7),
+            style_function=lambda feature: feature['properties']['style'],
+            popup=folium.GeoJsonPopup(
+                fields=['magnitude', 'place', 'time', 'depth', 'significance', 'tsunami'],
+                aliases=['Magnitude', 'Location', 'Time', 'Depth (km)', 'Significance', ''],
+                max_width=300
+            ),
+            tooltip=folium.GeoJsonTooltip(fields=['label'], labels=False)
+        ).add_to(m)
         
         # Add legend
         legend_html = self._create_legend()
@@ -142,22 +478,42 @@ class EarthquakeVisualizer:
         
         return m
     
+    def _earthquake_geojson(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """Build a GeoJSON FeatureCollection of quakes with per-point styles."""
+        magnitudes = df['magnitude'].to_numpy()
+        places = df['place'].astype(str)
+        styles = [{'fillColor': color, 'radius': radius}
+                  for color, radius in zip(self.colors_for(magnitudes).tolist(),
+                                           self.radii_for(magnitudes).tolist())]
+        columns = zip(
+            df['longitude'].tolist(),
+            df['latitude'].tolist(),
+            magnitudes.tolist(),
+            places.tolist(),
+            df['time'].dt.strftime('%Y-%m-%d %H:%M:%S').tolist(),
+            df['depth'].round(1).tolist(),
+            df['significance'].tolist(),
+            np.where(df['tsunami'].to_numpy() != 0, '🌊 Tsunami Warning', '').tolist(),
+            ('M' + df['magnitude'].astype(str) + ' - ' + places).tolist(),
+            styles
+        )
+        
+        features = [
+            {
+                'type': 'Feature',
+                'geometry': {'type': 'Point', 'coordinates': [lon, lat]},
+                'properties': {
+                    'magnitude': mag, 'place': place, 'time': time_str, 'depth': depth,
+                    'significance': sig, 'tsunami': tsunami, 'label': label, 'style': style
+                }
+            }
+            for lon, lat, mag, place, time_str, depth, sig, tsunami, label, style in columns
+        ]
+        return {'type': 'FeatureCollection', 'features': features}
+    
     def _create_legend(self) -> str:
         """Create HTML legend for the map."""
-        return """
-        <div style='position: fixed; 
-                    bottom: 50px; left: 50px; width: 150px; height: 120px; 
-                    background-color: white; border:2px solid grey; z-index:9999; 
-                    font-size:14px; padding: 10px'>
-        <p><b>Earthquake Magnitude</b></p>
-        <p><i class="fa fa-circle" style="color:#FFD700"></i> 4.0 - 4.9</p>
-        <p><i class="fa fa-circle" style="color:#FF8C00"></i> 5.0 - 5.9</p>
-        <p><i class="fa fa-circle" style="color:#FF4500"></i> 6.0 - 6.9</p>
-        <p><i class="fa fa-circle" style="color:#DC143C"></i> 7.0 - 7.9</p>
-        <p><i class="fa fa-circle" style="color:#8B0000"></i> 8.0 - 8.9</p>
-        <p><i class="fa fa-circle" style="color:#4B0082"></i> 9.0+</p>
-        </div>
-        """
+        return _LEGEND_HTML
     
     def create_magnitude_timeline(self, df: pd.DataFrame) -> folium.Map:
         """Create a timeline visualization of earthquakes."""
@@ -170,21 +526,35 @@ class EarthquakeVisualizer:
         # Create map
         m = folium.Map(zoom_start=2)
         
-        # Add time-based markers
-        for i, (_, quake) in enumerate(df_sorted.iterrows()):
-            color = self.get_color_by_magnitude(quake['magnitude'])
-            
-            # Opacity based on recency (more recent = more opaque)
-            opacity = 0.3 + (i / len(df_sorted)) * 0.7
-            
-            folium.CircleMarker(
-                location=[quake['latitude'], quake['longitude']],
-                radius=self.get_radius_by_magnitude(quake['magnitude']),
-                color=color,
-                fillColor=color,
-                fillOpacity=opacity,
-                popup=f"M{quake['magnitude']} - {quake['time'].strftime('%Y-%m-%d %H:%M')}"
-            ).add_to(m)
+        # Add time-based markers as one GeoJSON layer, styled per point
+        magnitudes = df_sorted['magnitude'].to_numpy()
+        colors = self.colors_for(magnitudes).tolist()
+        radii = self.radii_for(magnitudes).tolist()
+        # Opacity based on recency (more recent = more opaque)
+        opacities = (0.3 + np.arange(len(df_sorted)) / len(df_sorted) * 0.7).tolist()
+        labels = ('M' + df_sorted['magnitude'].astype(str) + ' - '
+                  + df_sorted['time'].dt.strftime('%Y-%m-%d %H:%M')).tolist()
+        
+        features = [
+            {
+                'type': 'Feature',
+                'geometry': {'type': 'Point', 'coordinates': [lon, lat]},
+                'properties': {
+                    'label': label,
+                    'style': {'color': color, 'fillColor': color, 'fillOpacity': opacity, 'radius': radius}
+                }
+            }
+            for lon, lat, label, color, opacity, radius in zip(
+                df_sorted['longitude'].tolist(), df_sorted['latitude'].tolist(),
+                labels, colors, opacities, radii
+            )
+        ]
+        folium.GeoJson(
+            {'type': 'FeatureCollection', 'features': features},
+            marker=folium.CircleMarker(fill=True),
+            style_function=lambda feature: feature['properties']['style'],
+            popup=folium.GeoJsonPopup(fields=['label'], labels=False)
+        ).add_to(m)
         
         return m
 
@@ -1,19 +1,37 @@
-import folium
+from __future__ import annotations
+
+import re
+import sqlite3
+import threading
+import time
+import numpy as np
 import pandas as pd
-import geopandas as gpd
-import plotly.express as px
-import plotly.graph_objects as go
 from geopy.geocoders import Nominatim
-from typing import List, Tuple, Optional
-import contextily as ctx
-import matplotlib.pyplot as plt
+from typing import Dict, List, Tuple, Optional, TYPE_CHECKING
+
+# folium, geopandas and plotly are imported by the methods that use them, so
+# importing this module (e.g. for the CLI) doesn't pay for all of them
+if TYPE_CHECKING:
+    import folium
+    import geopandas as gpd
+    import plotly.graph_objects as go
 
 class GeoVisualizer:
-    def __init__(self):
+    # How long geocoding results are reused before Nominatim is asked again
+    GEOCODE_CACHE_DAYS = 30
+    # Nominatim's usage policy allows at most one request per second
+    GEOCODE_MIN_INTERVAL = 1.0
+    
+    def __init__(self, cache_file: Optional[str] = "geocode_cache.sqlite"):
         self.geocoder = Nominatim(user_agent="myproject-geo")
+        self.cache_file = cache_file  # None disables the geocoding cache
+        self._cache: Optional[sqlite3.Connection] = None
+        self._cache_lock = threading.Lock()
     
     def create_basic_map(self, center_lat: float = 40.7128, center_lon: float = -74.0060, zoom: int = 10) -> folium.Map:
         """Create a basic folium map centered at given coordinates."""
+        import folium
+        
         return folium.Map(location=[center_lat, center_lon], zoom_start=zoom)
     
     def add_markers(self, map_obj: folium.Map, locations: List[Tuple[float, float, str]]) -> folium.Map:
@@ -23,28 +41,123 @@ class GeoVisualizer:
             map_obj: Folium map object
             locations: List of (lat, lon, popup_text) tuples
         """
+        import folium
+        
         for lat, lon, popup in locations:
             folium.Marker([lat, lon], popup=popup).add_to(map_obj)
         return map_obj
     
-    def geocode_address(self, address: str) -> Optional[Tuple[float, float]]:
-        """Geocode an address to lat/lon coordinates."""
+    def _open_cache(self) -> Optional[sqlite3.Connection]:
+        """Open the geocoding cache on first use; None if it is disabled or unusable."""
+        if self._cache is None and self.cache_file:
+            try:
+                db = sqlite3.connect(self.cache_file, check_same_thread=False)
+                with db:
+                    db.execute('CREATE TABLE IF NOT EXISTS geocode '
+                               '(address TEXT PRIMARY KEY, lat REAL, lon REAL, ts REAL NOT NULL)')
+                self._cache = db
+            except sqlite3.Error as e:
+                print(f"Warning: Could not open geocoding cache: {e}")
+                self.cache_file = None
+        return self._cache
+    
+    @staticmethod
+    def _cache_key(address: str) -> str:
+        """Normalize an address so trivially different spellings share a cache entry."""
+        return re.sub(r'\s+', ' ', address).strip().lower()
+    
+    def _cached_geocodes(self, keys: List[str]) -> Dict[str, Optional[Tuple[float, float]]]:
+        """Look up unexpired cache entries for ``keys`` in one query."""
+        cache = self._open_cache()
+        if cache is None or not keys:
+            return {}
+        placeholders = ','.join('?' * len(keys))
+        with self._cache_lock:
+            rows = cache.execute(
+                f'SELECT address, lat, lon FROM geocode WHERE ts > ? AND address IN ({placeholders})',
+                (time.time() - self.GEOCODE_CACHE_DAYS * 86400, *keys)
+            ).fetchall()
+        return {key: None if lat is None else (lat, lon) for key, lat, lon in rows}
+    
+    def _geocode_uncached(self, key: str, address: str) -> Optional[Tuple[float, float]]:
+        """Ask Nominatim for ``address`` and cache the answer under ``key``."""
         try:
             location = self.geocoder.geocode(address)
-            if location:
-                return (location.latitude, location.longitude)
         except Exception as e:
             print(f"Geocoding error: {e}")
-        return None
+            return None
+        
+        result = (location.latitude, location.longitude) if location else None
+        cache = self._open_cache()
+        if cache is not None:
+            try:
+                with self._cache_lock, cache:
+                    cache.execute('INSERT OR REPLACE INTO geocode (address, lat, lon, ts) VALUES (?, ?, ?, ?)',
+                                  (key, *(result or (None, None)), time.time()))
+            except sqlite3.Error as e:
+                print(f"Warning: Could not cache geocoding result: {e}")
+        return result
+    
+    def geocode_address(self, address: str) -> Optional[Tuple[float, float]]:
+        """Geocode an address to lat/lon coordinates.
+        
+        Results, including addresses Nominatim couldn't find, are cached on
+        disk by normalized address for ``GEOCODE_CACHE_DAYS``.
+        """
+        key = self._cache_key(address)
+        cached = self._cached_geocodes([key])
+        if key in cached:
+            return cached[key]
+        return self._geocode_uncached(key, address)
+    
+    def geocode_addresses(self, addresses: List[str]) -> List[Optional[Tuple[float, float]]]:
+        """Geocode many addresses, in order, like ``geocode_address``.
+        
+        Cache hits are read in one query and duplicates are resolved once.
+        Nominatim allows one request per second, so the remaining lookups are
+        spaced ``GEOCODE_MIN_INTERVAL`` apart rather than sent concurrently.
+        """
+        keys = [self._cache_key(address) for address in addresses]
+        results = self._cached_geocodes(list(dict.fromkeys(keys)))
+        
+        last_request = None
+        for key, address in zip(keys, addresses):
+            if key in results:
+                continue
+            if last_request is not None:
+                time.sleep(max(0.0, last_request + self.GEOCODE_MIN_INTERVAL - time.monotonic()))
+            last_request = time.monotonic()
+            results[key] = self._geocode_uncached(key, address)
+        return [results[key] for key in keys]
+    
+    def filter_by_bbox(self, gdf: gpd.GeoDataFrame, minx: float, miny: float,
+                       maxx: float, maxy: float) -> gpd.GeoDataFrame:
+        """Return the rows of ``gdf`` whose geometry intersects a bounding box.
+        
+        Candidates come from the frame's R-tree spatial index, which GeoPandas
+        builds on first use and keeps with the frame, so repeated queries don't
+        rescan every row. Rows keep their original order.
+        """
+        from shapely.geometry import box
+        
+        idx = gdf.sindex.query(box(minx, miny, maxx, maxy), predicate='intersects')
+        return gdf.iloc[np.sort(idx)]
     
     def create_scatter_mapbox(self, df: pd.DataFrame, lat_col: str, lon_col: str, 
                              color_col: Optional[str] = None, size_col: Optional[str] = None,
-                             title: str = "Scatter Map") -> go.Figure:
-        """Create an interactive scatter plot on a map using Plotly."""
+                             title: str = "Scatter Map",
+                             hover_cols: Optional[List[str]] = None) -> go.Figure:
+        """Create an interactive scatter plot on a map using Plotly.
+        
+        Hover labels show the coordinate, color and size columns plus any
+        ``hover_cols``; other columns are left out of the figure.
+        """
+        import plotly.express as px
+        
         fig = px.scatter_mapbox(
             df, lat=lat_col, lon=lon_col,
             color=color_col, size=size_col,
-            hover_data=df.columns,
+            hover_data=hover_cols,
             mapbox_style="open-street-map",
             title=title,
             zoom=10
@@ -53,15 +166,31 @@ class GeoVisualizer:
         return fig
     
     def create_choropleth_map(self, gdf: gpd.GeoDataFrame, value_col: str, 
-                             title: str = "Choropleth Map") -> folium.Map:
-        """Create a choropleth map from a GeoDataFrame."""
-        center_lat = gdf.geometry.centroid.y.mean()
-        center_lon = gdf.geometry.centroid.x.mean()
+                             title: str = "Choropleth Map",
+                             simplify_tol: Optional[float] = None) -> folium.Map:
+        """Create a choropleth map from a GeoDataFrame.
+        
+        Boundaries are embedded without their attribute columns, since the map
+        is keyed on the index and only needs the shapes. Pass ``simplify_tol``
+        (in CRS units) to drop vertices from large boundaries; each shape is
+        simplified on its own, so neighbouring polygons may no longer share an
+        edge exactly and thin gaps or overlaps can open between them.
+        """
+        import folium
+        
+        # Center on the overall extent: one pass over the bounds, no per-shape centroids
+        minx, miny, maxx, maxy = gdf.total_bounds
+        center_lat = (miny + maxy) / 2
+        center_lon = (minx + maxx) / 2
+        
+        geometry = gdf.geometry
+        if simplify_tol:
+            geometry = geometry.simplify(simplify_tol, preserve_topology=True)
         
         m = folium.Map(location=[center_lat, center_lon], zoom_start=10)
         
         folium.Choropleth(
-            geo_data=gdf.to_json(),
+            geo_data=geometry.to_json(),
             data=gdf,
             columns=[gdf.index, value_col],
             key_on="feature.id",
@@ -76,11 +205,13 @@ class GeoVisualizer:
     def create_heatmap(self, locations: List[Tuple[float, float]], 
                       center_lat: float = None, center_lon: float = None) -> folium.Map:
         """Create a heatmap from location data."""
+        import folium
         from folium.plugins import HeatMap
         
         if center_lat is None or center_lon is None:
-            center_lat = sum(loc[0] for loc in locations) / len(locations)
-            center_lon = sum(loc[1] for loc in locations) / len(locations)
+            # Locations may carry a third weight column; only lat/lon are averaged
+            coords = np.asarray(locations, dtype=np.float64)
+            center_lat, center_lon = coords[:, :2].mean(axis=0).tolist()
         
         m = folium.Map(location=[center_lat, center_lon], zoom_start=12)
         HeatMap(locations).add_to(m)
@@ -97,6 +228,12 @@ def create_sample_data() -> pd.DataFrame:
     }
     return pd.DataFrame(data)
 
+def to_geodataframe(df: pd.DataFrame, lat_col: str = 'lat', lon_col: str = 'lon') -> gpd.GeoDataFrame:
+    """Convert a DataFrame with lat/lon columns into a WGS84 point GeoDataFrame."""
+    import geopandas as gpd
+    
+    return gpd.GeoDataFrame(df, geometry=gpd.points_from_xy(df[lon_col], df[lat_col]), crs='EPSG:4326')
+
 def demo_visualizations():
     """Create demonstration visualizations."""
     geo_viz = GeoVisualizer()
@@ -1,9 +1,117 @@
-from flask import Flask, jsonify, render_template_string
-from .earthquakes import EarthquakeDataFetcher
-import json
+from flask import Flask, current_app, jsonify, render_template_string, request
+import numpy as np
+import pandas as pd
+import hashlib
+import os
+from .earthquakes import EarthquakeDataFetcher, earthquake_records, magnitude_bins
+from ._http import ORJSONProvider, compress_responses
+
+try:
+    import waitress
+except ImportError:  # pragma: no cover - exercised when waitress is absent
+    waitress = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:  # pragma: no cover - exercised when pyarrow is absent
+    pa = None
+
+# Fields sent per earthquake by /api/earthquakes
+EARTHQUAKE_FIELDS = ['magnitude', 'location', 'latitude', 'longitude', 'depth', 'time',
+                     'color', 'radius']
+
+# Frame columns the JSON and Arrow payloads are built from; ``frame_etag``
+# hashes these so any revision that changes a response changes the validator
+ETAG_COLUMNS = ['id', 'magnitude', 'place', 'location', 'latitude', 'longitude', 'depth', 'time']
+
+# Content type of the binary ``?format=arrow`` variant of /api/earthquakes
+ARROW_MIMETYPE = 'application/vnd.apache.arrow.stream'
+
+# Marker palette of the web pages: gold below M4, then one color per magnitude step
+MARKER_THRESHOLDS = np.array([4.0, 5.0, 6.0, 7.0])
+MARKER_COLORS = np.array(['#FFD700', '#FF4500', '#DC143C', '#8B0000', '#4B0082'])
+
+# Request threads of the production server
+SERVER_THREADS = 8
+
+# Browsers may reuse an /api/earthquakes response this long before revalidating
+EARTHQUAKES_MAX_AGE = 30
+
+def with_marker_style(df):
+    """Return ``df`` with per-quake marker ``color`` and ``radius`` columns.
+    
+    Computed in one vectorized pass so the browser doesn't branch per marker,
+    with the same band lookup as ``EarthquakeVisualizer.colors_for``; a missing
+    magnitude gets the lowest color and the minimum radius.
+    """
+    mag = df['magnitude'].to_numpy(dtype=float)
+    return df.assign(
+        color=MARKER_COLORS[magnitude_bins(mag, MARKER_THRESHOLDS)],
+        radius=np.fmax(5.0, mag * 3.0)
+    )
+
+def frame_etag(df):
+    """Validator for an earthquake frame.
+    
+    Combines vectorized per-row hashes of the payload columns (``ETAG_COLUMNS``)
+    with the row count, so it changes whenever USGS adds, drops or revises a
+    quake, without serializing the frame.
+    """
+    columns = df.columns.intersection(ETAG_COLUMNS)
+    rows = pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+    key = len(df).to_bytes(4, 'little') + np.uint64(rows.sum(dtype=np.uint64)).tobytes()
+    return hashlib.blake2b(key, digest_size=8).hexdigest()
+
+def conditional_response(etag, build_response):
+    """Answer 304 when the client already holds ``etag``, else ``build_response()``.
+    
+    ``build_response`` is only called on a miss, so unchanged refreshes skip
+    building and encoding the records entirely.
+    """
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = build_response()
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f'public, max-age={EARTHQUAKES_MAX_AGE}'
+    return response
+
+def conditional_json(etag, build_payload):
+    """``conditional_response`` for a JSON payload."""
+    return conditional_response(etag, lambda: jsonify(build_payload()))
+
+def arrow_response(df):
+    """Encode the magnitude, place, position, depth and time of ``df`` as an Arrow IPC stream.
+    
+    Columns travel as typed binary buffers, which is far smaller than JSON
+    for large windows and needs no parsing in the browser (apache-arrow's
+    ``tableFromIPC``).
+    """
+    schema = pa.schema([('magnitude', pa.float64()), ('place', pa.string()),
+                        ('latitude', pa.float64()), ('longitude', pa.float64()),
+                        ('depth', pa.float64()), ('time', pa.timestamp('ms'))])
+    if df.empty:
+        table = schema.empty_table()
+    else:
+        table = pa.Table.from_pandas(df[schema.names], schema=schema, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return current_app.response_class(sink.getvalue().to_pybytes(), mimetype=ARROW_MIMETYPE)
+
+def earthquakes_payload(df, fields):
+    """The ``/api/earthquakes`` body for a non-empty frame."""
+    earthquakes = earthquake_records(with_marker_style(df), fields)
+    return {'earthquakes': earthquakes, 'count': len(earthquakes)}
 
 def create_app():
     app = Flask(__name__)
+    app.json = ORJSONProvider(app)
+    compress_responses(app)
+    # One fetcher per app: its TTL cache and request coalescing let every
+    # client share the same upstream USGS fetch
+    fetcher = EarthquakeDataFetcher()
     
     @app.route('/')
     def home():
@@ -12,6 +120,7 @@ def create_app():
         <html>
         <head>
             <title>🌍 Earthquake Dashboard</title>
+            <link rel="preconnect" href="https://tile.openstreetmap.org">
             <script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
             <link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css" />
             <style>
@@ -50,8 +159,15 @@ def create_app():
 
             <script>
                 // Initialize map
-                const map = L.map('map').setView([20, 0], 2);
-                L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
+                // Canvas draws every marker in one paint instead of one SVG node each
+                const map = L.map('map', { preferCanvas: true }).setView([20, 0], 2);
+                // One HTTP/2 host (no a/b/c shards); skip tiles for in-between zoom levels,
+                // but load while panning and keep a ring of off-screen tiles so pans aren't blank
+                L.tileLayer('https://tile.openstreetmap.org/{z}/{x}/{y}.png', {
+                    maxZoom: 19,
+                    updateWhenZooming: false,
+                    updateWhenIdle: false,
+                    keepBuffer: 4,
                     attribution: '© OpenStreetMap contributors'
                 }).addTo(map);
 
@@ -67,25 +183,21 @@ def create_app():
                             const maxMag = Math.max(...data.earthquakes.map(eq => eq.magnitude));
                             document.getElementById('maxMag').textContent = 'M' + maxMag.toFixed(1);
                             
-                            // Add earthquakes to map
-                            data.earthquakes.forEach(eq => {
-                                const color = getMagnitudeColor(eq.magnitude);
-                                const marker = L.circleMarker([eq.latitude, eq.longitude], {
-                                    radius: Math.max(5, eq.magnitude * 3),
-                                    fillColor: color,
-                                    color: '#000',
-                                    weight: 1,
-                                    opacity: 1,
-                                    fillOpacity: 0.8
-                                }).addTo(map);
-                                
-                                marker.bindPopup(`
-                                    <b>M${eq.magnitude} Earthquake</b><br>
-                                    ${eq.location}<br>
-                                    ${new Date(eq.time).toLocaleString()}<br>
-                                    Depth: ${eq.depth.toFixed(1)} km
-                                `);
-                            });
+                            // Add earthquakes to map in one layer
+                            const markers = data.earthquakes.map(eq => L.circleMarker([eq.latitude, eq.longitude], {
+                                radius: eq.radius,
+                                fillColor: eq.color,
+                                color: '#000',
+                                weight: 1,
+                                opacity: 1,
+                                fillOpacity: 0.8
+                            }).bindPopup(`
+                                <b>M${eq.magnitude} Earthquake</b><br>
+                                ${eq.location}<br>
+                                ${new Date(eq.time).toLocaleString()}<br>
+                                Depth: ${eq.depth.toFixed(1)} km
+                            `));
+                            L.layerGroup(markers).addTo(map);
                         } else {
                             document.getElementById('count').textContent = '0';
                             document.getElementById('maxMag').textContent = 'N/A';
@@ -96,14 +208,6 @@ def create_app():
                         document.getElementById('count').textContent = 'Error';
                         document.getElementById('maxMag').textContent = 'Error';
                     });
-                
-                function getMagnitudeColor(magnitude) {
-                    if (magnitude >= 7) return '#4B0082';  // Purple
-                    if (magnitude >= 6) return '#8B0000';  // Dark Red
-                    if (magnitude >= 5) return '#DC143C';  // Red
-                    if (magnitude >= 4) return '#FF4500';  // Orange
-                    return '#FFD700';  // Gold
-                }
             </script>
         </body>
         </html>
@@ -112,24 +216,20 @@ def create_app():
     @app.route('/api/earthquakes')
     def earthquakes():
         try:
-            fetcher = EarthquakeDataFetcher()
+            if request.args.get('format') == 'arrow' and pa is None:
+                return jsonify({'error': 'Arrow output needs pyarrow (pip install seismowatch[arrow])'}), 406
+            
             df = fetcher.fetch_earthquakes(min_magnitude=4.0, days=1, limit=100)
             
+            if request.args.get('format') == 'arrow':
+                if df.empty:
+                    return arrow_response(df)
+                return conditional_response(f'{frame_etag(df)}-arrow', lambda: arrow_response(df))
+            
             if df.empty:
                 return jsonify({'earthquakes': [], 'count': 0})
             
-            earthquakes_list = []
-            for _, eq in df.iterrows():
-                earthquakes_list.append({
-                    'magnitude': float(eq['magnitude']),
-                    'location': str(eq['place']),
-                    'latitude': float(eq['latitude']),
-                    'longitude': float(eq['longitude']),
-                    'depth': float(eq['depth']),
-                    'time': eq['time'].isoformat()
-                })
-            
-            return jsonify({'earthquakes': earthquakes_list, 'count': len(earthquakes_list)})
+            return conditional_json(frame_etag(df), lambda: earthquakes_payload(df, EARTHQUAKE_FIELDS))
         
         except Exception as e:
             return jsonify({'error': str(e), 'earthquakes': [], 'count': 0})
@@ -148,6 +248,20 @@ def create_app():
     
     return app
 
+def serve(app, host='127.0.0.1', port=5000):
+    """Serve ``app`` with waitress, or Flask's reloading debugger if FLASK_DEBUG=1.
+    
+    Without the ``prod`` extra this falls back to the threaded Werkzeug
+    server. For several processes, run e.g.
+    ``gunicorn -k gthread -w 4 --threads 8 'seismowatch.web:create_app()'``.
+    """
+    if os.environ.get('FLASK_DEBUG') == '1':
+        app.run(host=host, port=port, debug=True, threaded=True)
+    elif waitress is not None:
+        waitress.serve(app, host=host, port=port, threads=SERVER_THREADS)
+    else:
+        print('⚠️ waitress not installed (pip install seismowatch[prod]); using the Werkzeug server')
+        app.run(host=host, port=port, threaded=True)
+
 if __name__ == '__main__':
-    app = create_app()
-    app.run(debug=True)
\ No newline at end of file
+    serve(create_app())
@@ -21,7 +21,7 @@ setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     url="https://github.com/snakewizardd/ccbox",
-    packages=find_packages(),
+    packages=find_packages(exclude=["tests", "tests.*"]),
     classifiers=[
         "Development Status :: 5 - Production/Stable",
         "Intended Audience :: Science/Research",
@@ -55,6 +55,23 @@ setup(
             "sphinx-rtd-theme>=1.0.0",
             "myst-parser>=0.18.0",
         ],
+        "fast": [
+            "numba>=0.57.0",
+            "orjson>=3.8.0",
+        ],
+        "stream": [
+            "ijson>=3.1",
+        ],
+        "compress": [
+            "brotli>=1.0.9",
+        ],
+        "arrow": [
+            "pyarrow>=10.0.0",
+        ],
+        "prod": [
+            "waitress>=2.1.0",
+            "gunicorn>=21.0.0",
+        ],
     },
     entry_points={
         "console_scripts": [
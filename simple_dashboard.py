@@ -1,18 +1,28 @@
 #!/usr/bin/env python3
 """Simple earthquake dashboard without WebSocket complications."""
 
-from flask import Flask, render_template_string, jsonify
-from seismowatch.earthquakes import EarthquakeDataFetcher
-import json
+from flask import Flask, Response, jsonify, stream_template, stream_with_context
+from jinja2 import DictLoader
+from seismowatch.earthquakes import EarthquakeDataFetcher, earthquake_records
+from seismowatch._http import ORJSONProvider, compress_responses
+from seismowatch.web import (EARTHQUAKE_FIELDS, with_marker_style, frame_etag, conditional_json,
+                            earthquakes_payload, serve)
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
+compress_responses(app)
+# Shared by all requests so its TTL cache serves repeat loads without USGS
+fetcher = EarthquakeDataFetcher()
 
-HTML_TEMPLATE = '''<!DOCTYPE html>
+# Static top of the page, sent before the USGS fetch so the browser can
+# start loading Leaflet meanwhile
+HEAD_HTML = '''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>🌍 Earthquake Dashboard</title>
+    <link rel="preconnect" href="https://tile.openstreetmap.org">
     <script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
     <link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css" />
     <style>
@@ -46,7 +56,10 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
             <div id="map"></div>
         </div>
         
-        <div class="sidebar">
+'''
+
+# Data-dependent rest of the page
+BODY_TEMPLATE = '''        <div class="sidebar">
             <div class="panel">
                 <h3>📊 Statistics</h3>
                 <button class="refresh-btn" onclick="refreshData()">🔄 Refresh</button>
@@ -68,7 +81,7 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
                     {% for eq in earthquakes[:5] %}
                     <div style="background: #333; margin: 0.5rem 0; padding: 0.5rem; border-radius: 5px;">
                         <strong>M{{ "%.1f"|format(eq.magnitude) }}</strong> - {{ eq.location }}<br>
-                        <small>{{ eq.time.strftime('%Y-%m-%d %H:%M UTC') }}</small>
+                        <small>{{ eq.time }}</small>
                     </div>
                     {% endfor %}
                 </div>
@@ -76,43 +89,39 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
         </div>
     </div>
 
+    <script type="application/json" id="eq-data">{{ earthquakes | tojson }}</script>
     <script>
         // Initialize map
-        const map = L.map('map').setView([20, 0], 2);
-        L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
+        // Canvas draws every marker in one paint instead of one SVG node each
+        const map = L.map('map', { preferCanvas: true }).setView([20, 0], 2);
+        // One HTTP/2 host (no a/b/c shards); skip tiles for in-between zoom levels,
+        // but load while panning and keep a ring of off-screen tiles so pans aren't blank
+        L.tileLayer('https://tile.openstreetmap.org/{z}/{x}/{y}.png', {
+            maxZoom: 19,
+            updateWhenZooming: false,
+            updateWhenIdle: false,
+            keepBuffer: 4,
             attribution: '© OpenStreetMap contributors'
         }).addTo(map);
 
-        // Earthquake data
-        const earthquakes = {{ earthquakes_json | safe }};
-        
-        function getMagnitudeColor(magnitude) {
-            if (magnitude >= 7) return '#4B0082';
-            if (magnitude >= 6) return '#8B0000';
-            if (magnitude >= 5) return '#DC143C';
-            if (magnitude >= 4) return '#FF4500';
-            return '#FFD700';
-        }
+        // Earthquake data, parsed from the JSON block rather than a JS literal
+        const earthquakes = JSON.parse(document.getElementById('eq-data').textContent);
         
-        // Add earthquakes to map
-        earthquakes.forEach(eq => {
-            const color = getMagnitudeColor(eq.magnitude);
-            const marker = L.circleMarker([eq.latitude, eq.longitude], {
-                radius: Math.max(5, eq.magnitude * 3),
-                fillColor: color,
-                color: '#000',
-                weight: 1,
-                opacity: 1,
-                fillOpacity: 0.8
-            }).addTo(map);
-            
-            marker.bindPopup(`
-                <b>M${eq.magnitude} Earthquake</b><br>
-                ${eq.location}<br>
-                ${eq.time}<br>
-                Depth: ${eq.depth.toFixed(1)} km
-            `);
-        });
+        // Add earthquakes to map in one layer; color and radius come precomputed
+        const markers = earthquakes.map(eq => L.circleMarker([eq.latitude, eq.longitude], {
+            radius: eq.radius,
+            fillColor: eq.color,
+            color: '#000',
+            weight: 1,
+            opacity: 1,
+            fillOpacity: 0.8
+        }).bindPopup(`
+            <b>M${eq.magnitude} Earthquake</b><br>
+            ${eq.location}<br>
+            ${eq.time}<br>
+            Depth: ${eq.depth.toFixed(1)} km
+        `));
+        L.layerGroup(markers).addTo(map);
         
         function refreshData() {
             location.reload();
@@ -123,65 +132,48 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
 </body>
 </html>'''
 
+# Loaded by name so Jinja compiles the page once and reuses it per request
+app.jinja_loader = DictLoader({'dashboard_body.html': BODY_TEMPLATE})
+
 @app.route('/')
 def dashboard():
-    """Main dashboard page."""
-    fetcher = EarthquakeDataFetcher()
-    
-    # Get recent earthquakes
-    df = fetcher.fetch_earthquakes(min_magnitude=4.0, days=1, limit=100)
-    
-    if df.empty:
-        earthquakes = []
-        count = 0
-        max_mag = 0
-    else:
-        earthquakes = []
-        for _, eq in df.iterrows():
-            earthquakes.append({
-                'magnitude': eq['magnitude'],
-                'location': eq['place'],
-                'latitude': eq['latitude'],
-                'longitude': eq['longitude'],
-                'depth': eq['depth'],
-                'time': eq['time'].strftime('%Y-%m-%d %H:%M UTC')
-            })
-        count = len(earthquakes)
-        max_mag = f"{df['magnitude'].max():.1f}"
-    
-    earthquakes_json = json.dumps(earthquakes)
+    """Main dashboard page, streamed so the head isn't held up by USGS."""
+    def generate():
+        yield HEAD_HTML
+        
+        # Get recent earthquakes
+        df = fetcher.fetch_earthquakes(min_magnitude=4.0, days=1, limit=100)
+        
+        if df.empty:
+            earthquakes = []
+            count = 0
+            max_mag = 0
+        else:
+            earthquakes = earthquake_records(with_marker_style(df), EARTHQUAKE_FIELDS,
+                                             time_format='%Y-%m-%d %H:%M UTC')
+            count = len(earthquakes)
+            max_mag = f"{df['magnitude'].max():.1f}"
+        
+        yield from stream_template('dashboard_body.html',
+                                   earthquakes=earthquakes,
+                                   count=count,
+                                   max_mag=max_mag)
     
-    return render_template_string(HTML_TEMPLATE, 
-                                earthquakes=earthquakes,
-                                earthquakes_json=earthquakes_json,
-                                count=count,
-                                max_mag=max_mag)
+    return Response(stream_with_context(generate()), mimetype='text/html')
 
 @app.route('/api/earthquakes')
 def api_earthquakes():
     """API endpoint for earthquake data."""
-    fetcher = EarthquakeDataFetcher()
     df = fetcher.fetch_earthquakes(min_magnitude=4.0, days=1, limit=100)
     
     if df.empty:
         return jsonify({'earthquakes': [], 'count': 0})
     
-    earthquakes = []
-    for _, eq in df.iterrows():
-        earthquakes.append({
-            'magnitude': eq['magnitude'],
-            'location': eq['place'],
-            'latitude': eq['latitude'],
-            'longitude': eq['longitude'],
-            'depth': eq['depth'],
-            'time': eq['time'].isoformat()
-        })
-    
-    return jsonify({'earthquakes': earthquakes, 'count': len(earthquakes)})
+    return conditional_json(frame_etag(df), lambda: earthquakes_payload(df, EARTHQUAKE_FIELDS))
 
 if __name__ == '__main__':
     print('🌍 Starting Simple Earthquake Dashboard...')
     print('📡 Go to: http://127.0.0.1:5001')
     print('🚨 Loading real earthquake data from USGS...')
     
-    app.run(host='127.0.0.1', port=5001, debug=True)
+    serve(app, host='127.0.0.1', port=5001)
@@ -1,6 +1,12 @@
 #!/usr/bin/env python3
-"""Absolute minimal test to see what's happening."""
+"""Absolute minimal test to see what's happening.
 
+For anything beyond a local smoke test, serve the ASGI wrapper instead:
+
+    gunicorn --chdir tests/manual -k uvicorn.workers.UvicornWorker minimal_server:asgi_app
+"""
+
+from asgiref.wsgi import WsgiToAsgi
 from flask import Flask
 
 app = Flask(__name__)
@@ -16,10 +22,12 @@ def hello():
     </html>
     """
 
+asgi_app = WsgiToAsgi(app)
+
 if __name__ == '__main__':
     print("="*50)
     print("STARTING MINIMAL TEST SERVER")
     print("Go to: http://127.0.0.1:9999")
     print("="*50)
-    app.run(host='127.0.0.1', port=9999, debug=False)
+    app.run(host='127.0.0.1', port=9999, debug=False, threaded=True)
 
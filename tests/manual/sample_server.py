@@ -1,6 +1,12 @@
 #!/usr/bin/env python3
-"""Super simple test server to verify Flask is working."""
+"""Super simple test server to verify Flask is working.
 
+For anything beyond a local smoke test, serve the ASGI wrapper instead:
+
+    gunicorn --chdir tests/manual -k uvicorn.workers.UvicornWorker sample_server:asgi_app
+"""
+
+from asgiref.wsgi import WsgiToAsgi
 from flask import Flask
 
 app = Flask(__name__)
@@ -18,10 +24,12 @@ def hello():
     </html>
     '''
 
+asgi_app = WsgiToAsgi(app)
+
 if __name__ == '__main__':
     print('🔥 Starting test server...')
     print('📡 Go to: http://127.0.0.1:8000')
     print('🚀 This should definitely work!')
     
-    app.run(host='127.0.0.1', port=8000, debug=True)
+    app.run(host='127.0.0.1', port=8000, debug=True, threaded=True)
 
@@ -0,0 +1,361 @@
+import asyncio
+import copy
+import json
+import pytest
+import smtplib
+import sqlite3
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from unittest.mock import patch, MagicMock
+import os
+import pickle
+
+from seismowatch import _kernels, alerts
+from seismowatch.alerts import (AlertZone, EarthquakeMonitor, EarthquakeAlert, EmailNotificationHandler,
+                                ConsoleNotificationHandler, FileNotificationHandler, NotificationHandler, match_zones)
+
+def make_quakes(rows):
+    """Build a DataFrame shaped like EarthquakeDataFetcher.fetch_earthquakes output."""
+    columns = ['id', 'latitude', 'longitude', 'magnitude', 'depth', 'place', 'time', 'tsunami']
+    return pd.DataFrame(rows, columns=columns)
+
+class RecordingHandler(NotificationHandler):
+    def __init__(self):
+        self.batches = []
+
+    def send_alert(self, alert):
+        self.batches.append([alert])
+        return True
+
+    def send_alerts(self, alerts):
+        self.batches.append(list(alerts))
+        return True
+
+class TestMatchZones:
+    def setup_method(self):
+        self.zones = [
+            AlertZone("California", 36.7783, -119.4179, 500, 4.0),
+            AlertZone("Global Major Events", 0, 0, 50000, 6.0),
+        ]
+
+    def test_matches_agree_with_contains_earthquake(self):
+        df = make_quakes([
+            ('a', 36.5, -119.0, 4.5, 10.0, 'CA', datetime(2024, 1, 1), 0),
+            ('b', 36.5, -119.0, 6.5, 10.0, 'CA', datetime(2024, 1, 1), 0),
+            ('c', -20.0, 170.0, 6.5, 10.0, 'Vanuatu', datetime(2024, 1, 1), 1),
+            ('d', -20.0, 170.0, 4.5, 10.0, 'Vanuatu', datetime(2024, 1, 1), 0),
+        ])
+
+        expected = []
+        for _, eq in df.iterrows():
+            hits = [i for i, z in enumerate(self.zones)
+                    if z.contains_earthquake(eq['latitude'], eq['longitude'], eq['magnitude'])]
+            expected.append(hits[0] if hits else -1)
+
+        assert match_zones(df, self.zones).tolist() == expected == [0, 0, 1, -1]
+
+    def test_compiled_kernel_matches_numpy_path(self):
+        if _kernels.match_zones_kernel is None:
+            pytest.skip("numba not installed")
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({'latitude': rng.uniform(-90, 90, 500),
+                           'longitude': rng.uniform(-180, 180, 500),
+                           'magnitude': rng.uniform(3, 7, 500)})
+        with patch.object(alerts.ZoneIndex, 'KERNEL_MIN_ZONES', 0):
+            compiled = match_zones(df, self.zones)
+        assert match_zones(df, self.zones).tolist() == compiled.tolist()
+
+    def test_nan_rows_never_match(self):
+        df = pd.DataFrame({'latitude': [36.5, np.nan, 36.5],
+                           'longitude': [-119.0, -119.0, np.nan],
+                           'magnitude': [np.nan, 6.5, 6.5]})
+        expected = [-1, -1, -1]
+        assert match_zones(df, self.zones).tolist() == expected
+        with patch.object(alerts.ZoneIndex, 'KERNEL_MIN_ZONES', 0):
+            with patch.object(_kernels, 'match_zones_kernel', _kernels._match_zones):
+                assert match_zones(df, self.zones).tolist() == expected
+            if _kernels.match_zones_kernel is not None:
+                assert match_zones(df, self.zones).tolist() == expected
+
+    def test_bounding_box_wraps_antimeridian(self):
+        zones = [AlertZone("Fiji", -17.0, 179.5, 300, 4.0)]
+        df = make_quakes([
+            ('a', -17.0, -179.5, 5.0, 10.0, 'East of the line', datetime(2024, 1, 1), 0),
+            ('b', -17.0, 175.0, 5.0, 10.0, 'Too far west', datetime(2024, 1, 1), 0),
+        ])
+        expected = [0 if zones[0].contains_earthquake(lat, lon, 5.0) else -1
+                    for lat, lon in zip(df['latitude'], df['longitude'])]
+        assert expected == [0, -1]
+        assert match_zones(df, zones).tolist() == expected
+        with patch.object(alerts.ZoneIndex, 'KERNEL_MIN_ZONES', 0):
+            assert match_zones(df, zones).tolist() == expected
+
+    def test_below_every_magnitude_threshold(self):
+        df = make_quakes([('a', 36.5, -119.0, 3.2, 10.0, 'CA', datetime(2024, 1, 1), 0)])
+        assert match_zones(df, self.zones).tolist() == [-1]
+        with patch.object(alerts.ZoneIndex, 'KERNEL_MIN_ZONES', 0), \
+                patch.object(_kernels, 'match_zones_kernel') as mock_kernel, \
+                patch.object(alerts.np, 'nonzero') as mock_nonzero:
+            assert match_zones(df, self.zones).tolist() == [-1]
+        mock_kernel.assert_not_called()
+        mock_nonzero.assert_not_called()
+
+    def test_small_zone_sets_skip_the_kernel(self):
+        df = make_quakes([('a', 36.5, -119.0, 4.5, 10.0, 'CA', datetime(2024, 1, 1), 0)])
+        with patch.object(_kernels, 'match_zones_kernel') as mock_kernel:
+            assert match_zones(df, self.zones).tolist() == [0]
+        mock_kernel.assert_not_called()
+
+    def test_empty_inputs(self):
+        assert match_zones(make_quakes([]), self.zones).tolist() == []
+        df = make_quakes([('a', 36.5, -119.0, 4.5, 10.0, 'CA', datetime(2024, 1, 1), 0)])
+        assert match_zones(df, []).tolist() == [-1]
+
+class TestEarthquakeMonitor:
+    @pytest.fixture(autouse=True)
+    def setup_monitor(self, tmp_path, monkeypatch):
+        # The monitor persists its state to the working directory
+        monkeypatch.chdir(tmp_path)
+        self.monitor = EarthquakeMonitor()
+        self.monitor.add_alert_zone(AlertZone("California", 36.7783, -119.4179, 500, 4.0))
+        self.handler = RecordingHandler()
+        self.monitor.add_notification_handler(self.handler)
+
+    def test_check_alerts_once_per_new_earthquake(self):
+        df = make_quakes([
+            ('a', 36.5, -119.0, 4.5, 10.0, 'CA', datetime(2024, 1, 1), 0),
+            ('b', -20.0, 170.0, 6.5, 10.0, 'Vanuatu', datetime(2024, 1, 1), 1),
+        ])
+        with patch.object(self.monitor.fetcher, 'fetch_earthquakes', return_value=df):
+            self.monitor.check_for_earthquakes()
+            self.monitor.check_for_earthquakes()
+
+        assert len(self.handler.batches) == 1
+        [alert] = self.handler.batches[0]
+        assert alert.earthquake_id == 'a'
+        assert alert.zone_name == "California"
+        assert alert.time == datetime(2024, 1, 1)
+        assert alert.time.strftime('%Y') == '2024'
+        assert alert.tsunami_warning is False
+        assert set(self.monitor.seen_earthquakes) == {'a', 'b'}
+
+    def test_state_is_persisted_and_reloaded(self):
+        df = make_quakes([('a', 36.5, -119.0, 4.5, 10.0, 'CA', datetime(2024, 1, 1), 0)])
+        with patch.object(self.monitor.fetcher, 'fetch_earthquakes', return_value=df):
+            self.monitor.check_for_earthquakes()
+        df = make_quakes([('b', 36.5, -119.0, 4.5, 10.0, 'CA', datetime(2024, 1, 1), 0)])
+        with patch.object(self.monitor.fetcher, 'fetch_earthquakes', return_value=df):
+            self.monitor.check_for_earthquakes()
+
+        db = sqlite3.connect(self.monitor.data_file)
+        assert sorted(row[0] for row in db.execute('SELECT id FROM seen')) == ['a', 'b']
+
+        reloaded = EarthquakeMonitor()
+        assert set(reloaded.seen_earthquakes) == {'a', 'b'}
+        assert reloaded.last_check == self.monitor.last_check
+
+    def test_state_file_is_created_on_first_save(self):
+        assert not os.path.exists(self.monitor.data_file)
+        self.monitor._mark_seen('a')
+        self.monitor._unsaved_ids.append('a')
+        self.monitor._save_state()
+        assert os.path.exists(self.monitor.data_file)
+
+    def test_close_releases_state_database(self):
+        self.monitor._unsaved_ids.append('a')
+        self.monitor._save_state()
+        self.monitor.close()
+        assert self.monitor._db is None
+
+    def test_expired_ids_are_pruned(self):
+        self.monitor._db = self.monitor._open_db()
+        self.monitor._db.execute('INSERT INTO seen (id, ts) VALUES (?, ?)', ('old', 0.0))
+        self.monitor._db.commit()
+        self.monitor._mark_seen('new')
+        self.monitor._unsaved_ids.append('new')
+        self.monitor._save_state()
+
+        rows = [row[0] for row in self.monitor._db.execute('SELECT id FROM seen')]
+        assert rows == ['new']
+        assert list(EarthquakeMonitor().seen_earthquakes) == ['new']
+
+    def test_seen_ids_are_capped(self):
+        self.monitor.SEEN_CAPACITY = 2
+        for eq_id in ['a', 'b', 'c']:
+            self.monitor._mark_seen(eq_id)
+        assert list(self.monitor.seen_earthquakes) == ['b', 'c']
+
+    def test_loads_legacy_json_state(self):
+        with open('alert_data.json', 'w') as f:
+            json.dump({'seen_earthquakes': ['x', 'y'], 'last_check': '2024-01-01T00:00:00'}, f)
+
+        monitor = EarthquakeMonitor()
+        assert list(monitor.seen_earthquakes) == ['x', 'y']
+        assert monitor.last_check == datetime(2024, 1, 1)
+        # Imported into the database, so the JSON file is no longer needed
+        os.remove('alert_data.json')
+        assert set(EarthquakeMonitor().seen_earthquakes) == {'x', 'y'}
+
+    def test_stop_monitoring_keeps_http_session_open(self):
+        with patch.object(self.monitor.fetcher.session, 'close') as mock_close:
+            self.monitor.stop_monitoring()
+        mock_close.assert_not_called()
+
+    def test_close_only_closes_own_fetcher(self):
+        with patch.object(self.monitor.fetcher.session, 'close') as mock_close:
+            self.monitor.close()
+        mock_close.assert_called_once()
+
+        shared = MagicMock()
+        EarthquakeMonitor(fetcher=shared).close()
+        shared.close.assert_not_called()
+
+    def test_run_wakes_immediately_when_stopped(self):
+        self.monitor.check_interval = 60
+        with patch.object(self.monitor, 'check_for_earthquakes',
+                          side_effect=self.monitor.stop_monitoring) as mock_check:
+            asyncio.run(asyncio.wait_for(self.monitor.run(), timeout=5))
+
+        mock_check.assert_called_once()
+        assert not self.monitor.running
+
+    def test_fetch_floor_follows_weakest_zone(self):
+        with patch.object(self.monitor.fetcher, 'fetch_earthquakes', return_value=make_quakes([])) as mock_fetch:
+            self.monitor.check_for_earthquakes()
+            self.monitor.add_alert_zone(AlertZone("Oklahoma", 35.5, -97.5, 200, 3.0))
+            self.monitor.check_for_earthquakes()
+
+        floors = [c.kwargs['min_magnitude'] for c in mock_fetch.call_args_list]
+        assert floors == [pytest.approx(3.8), 3.0]
+
+    def test_zone_index_rebuilt_when_zones_change(self):
+        index = self.monitor._get_zone_index()
+        assert self.monitor._get_zone_index() is index
+
+        self.monitor.add_alert_zone(AlertZone("Japan", 36.2048, 138.2529, 1000, 4.5))
+        assert self.monitor._get_zone_index().zones == tuple(self.monitor.alert_zones)
+
+        # Editing a zone in place also invalidates the index
+        index = self.monitor._get_zone_index()
+        self.monitor.alert_zones[-1].min_magnitude = 6.0
+        assert self.monitor._get_zone_index() is not index
+        assert self.monitor._get_zone_index().min_mags[-1] == 6.0
+
+class TestAlertZone:
+    def test_contains_earthquake_uses_great_circle_radius(self):
+        zone = AlertZone("San Francisco Bay Area", 37.7749, -122.4194, 560, 4.0)
+        # Los Angeles is ~559 km away
+        assert zone.contains_earthquake(34.0522, -118.2437, 5.0)
+        assert not AlertZone("SF", 37.7749, -122.4194, 550, 4.0).contains_earthquake(34.0522, -118.2437, 5.0)
+        assert not zone.contains_earthquake(34.0522, -118.2437, 3.9)
+
+    def test_global_radius_covers_antipode(self):
+        zone = AlertZone("Global Major Events", 0, 0, 50000, 6.0)
+        assert zone.contains_earthquake(0.0, 180.0, 6.0)
+
+    def test_contains_across_antimeridian(self):
+        # One degree of longitude at the equator (~111 km), not 359
+        zone = AlertZone("Date Line", 0.0, 179.5, 112, 4.0)
+        assert zone.contains_earthquake(0.0, -179.5, 5.0)
+        assert not AlertZone("Date Line", 0.0, 179.5, 110, 4.0).contains_earthquake(0.0, -179.5, 5.0)
+
+    def test_bbox_mask_is_superset_of_contains(self):
+        rng = np.random.default_rng(3)
+        lats = rng.uniform(-90, 90, 2000)
+        lons = rng.uniform(-180, 180, 2000)
+        for zone in (AlertZone("Japan", 36.2048, 138.2529, 1000, 4.5),
+                     AlertZone("Fiji", -17.7, 179.5, 800, 4.0)):
+            mask = zone.bbox_mask(lats, lons)
+            inside = np.array([zone.contains_earthquake(lat, lon, 9.0) for lat, lon in zip(lats, lons)])
+            assert mask[inside].all()
+            assert mask.sum() < len(lats) // 10
+
+    def test_editing_zone_updates_cached_geometry(self):
+        zone = AlertZone("SF", 37.7749, -122.4194, 550, 4.0)
+        assert not zone.contains_earthquake(34.0522, -118.2437, 5.0)
+        zone.radius_km = 560
+        assert zone.contains_earthquake(34.0522, -118.2437, 5.0)
+        zone.center_lat, zone.center_lon = 34.0522, -118.2437
+        assert zone.bbox_mask([34.0522], [-118.2437]).tolist() == [True]
+
+    def test_zone_can_be_copied_and_pickled(self):
+        zone = AlertZone("Japan", 36.2048, 138.2529, 1000, 4.5)
+        for clone in (copy.deepcopy(zone), pickle.loads(pickle.dumps(zone))):
+            assert clone == zone
+            assert clone._hav_radius == zone._hav_radius
+            assert clone.contains_earthquake(36.0, 138.0, 5.0)
+
+class TestEmailNotificationHandler:
+    def setup_method(self):
+        self.handler = EmailNotificationHandler('smtp.example.com', 587, 'user', 'secret',
+                                                ['a@example.com', 'b@example.com'])
+        self.alert = EarthquakeAlert('us1', 6.1, 'Testville', 1.0, 2.0, 10.0,
+                                     datetime(2024, 1, 1), 'Global', datetime(2024, 1, 1))
+
+    @patch('seismowatch.alerts.smtplib.SMTP')
+    def test_connection_is_reused_across_alerts(self, mock_smtp):
+        mock_smtp.return_value.noop.return_value = (250, b'OK')
+
+        assert self.handler.send_alert(self.alert)
+        assert self.handler.send_alert(self.alert)
+
+        mock_smtp.assert_called_once_with('smtp.example.com', 587)
+        mock_smtp.return_value.login.assert_called_once()
+        assert mock_smtp.return_value.send_message.call_count == 2
+
+        self.handler.close()
+        mock_smtp.return_value.quit.assert_called_once()
+
+    @patch('seismowatch.alerts.smtplib.SMTP')
+    def test_reconnects_once_after_disconnect(self, mock_smtp):
+        stale, fresh = MagicMock(), MagicMock()
+        mock_smtp.side_effect = [stale, fresh]
+        stale.send_message.side_effect = smtplib.SMTPServerDisconnected()
+
+        assert self.handler.send_alert(self.alert)
+
+        assert mock_smtp.call_count == 2
+        fresh.send_message.assert_called_once()
+
+    @patch('seismowatch.alerts.smtplib.SMTP')
+    def test_batch_is_sent_as_one_email(self, mock_smtp):
+        mock_smtp.return_value.noop.return_value = (250, b'OK')
+        second = EarthquakeAlert('us2', 7.2, 'Elsewhere', 3.0, 4.0, 20.0,
+                                 datetime(2024, 1, 1), 'Global', datetime(2024, 1, 1), True)
+
+        assert self.handler.send_alerts([self.alert, second])
+
+        mock_smtp.return_value.send_message.assert_called_once()
+        msg = mock_smtp.return_value.send_message.call_args.args[0]
+        assert msg['Subject'].startswith('🚨 EARTHQUAKE ALERTS: 2 earthquakes, up to M7.2')
+        body = msg.get_payload()[0].get_payload(decode=True).decode('utf-8')
+        assert 'Testville' in body and 'TSUNAMI WARNING' in body
+
+class TestFileNotificationHandler:
+    def test_batch_is_written_in_one_open(self, tmp_path):
+        handler = FileNotificationHandler(str(tmp_path / 'alerts.log'))
+        alerts = [EarthquakeAlert(f'us{i}', 5.0 + i, f'Place {i}', 1.0, 2.0, 10.0,
+                                  datetime(2024, 1, 1), 'Global', datetime(2024, 1, 1))
+                  for i in range(3)]
+
+        with patch('builtins.open', wraps=open) as mock_open:
+            assert handler.send_alerts(alerts)
+        mock_open.assert_called_once()
+
+        assert handler.send_alert(alerts[0])
+        lines = (tmp_path / 'alerts.log').read_text().splitlines()
+        assert len(lines) == 4
+        assert lines[0].endswith('M5.0 earthquake in Place 0 (1.000, 2.000) - Zone: Global')
+
+class TestConsoleNotificationHandler:
+    def test_banner_written_in_one_call(self, capsys):
+        alert = EarthquakeAlert('us1', 6.1, 'Testville', 1.0, 2.0, 10.0,
+                                datetime(2024, 1, 1), 'Global', datetime(2024, 1, 1), True)
+
+        assert ConsoleNotificationHandler().send_alert(alert)
+
+        out = capsys.readouterr().out
+        assert '📍 Zone: Global\n📊 Magnitude: 6.1\n' in out
+        assert '⏰ Time: 2024-01-01 00:00:00 UTC\n📏 Depth: 10.0 km\n' in out
+        assert '⚠️  🌊 TSUNAMI WARNING!\n' in out
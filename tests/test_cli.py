@@ -1,12 +1,8 @@
 import pytest
 from click.testing import CliRunner
 from unittest.mock import patch, MagicMock
-import sys
-import os
 import runpy
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-
 from seismowatch.cli import main
 
 class TestCLI:
@@ -0,0 +1,190 @@
+import asyncio
+import pytest
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from unittest.mock import patch, AsyncMock, MagicMock
+
+from seismowatch.dashboard import create_dashboard, DashboardNotificationHandler, SocketIOJSON
+
+FEED_BODY = b'{"type": "FeatureCollection", "features": []}'
+
+class TestDashboardFeed:
+    @pytest.fixture(autouse=True)
+    def setup_dashboard(self, tmp_path, monkeypatch):
+        # The alert monitor persists its state to the working directory
+        monkeypatch.chdir(tmp_path)
+        self.dashboard = create_dashboard()
+        self.dashboard.app.config['TESTING'] = True
+        self.client = self.dashboard.app.test_client()
+
+    def test_feed_is_cached_between_requests(self):
+        with patch.object(self.dashboard.fetcher, 'fetch_geojson', return_value=FEED_BODY) as mock_fetch:
+            first = self.client.get('/api/feed')
+            second = self.client.get('/api/feed')
+
+        assert first.status_code == 200
+        assert first.data == FEED_BODY
+        assert first.content_type == 'application/json'
+        assert 'max-age=30' in first.headers['Cache-Control']
+        assert second.data == FEED_BODY
+        mock_fetch.assert_called_once()
+
+    def test_feed_returns_304_for_matching_etag(self):
+        with patch.object(self.dashboard.fetcher, 'fetch_geojson', return_value=FEED_BODY):
+            etag = self.client.get('/api/feed').headers['ETag']
+            response = self.client.get('/api/feed', headers={'If-None-Match': etag})
+
+        assert response.status_code == 304
+        assert response.data == b''
+
+    def test_feed_upstream_error(self):
+        with patch.object(self.dashboard.fetcher, 'fetch_geojson', side_effect=Exception('USGS down')):
+            response = self.client.get('/api/feed')
+
+        assert response.status_code == 502
+        assert response.get_json()['error'] == 'USGS down'
+
+    def test_feed_compact_format(self):
+        geojson = (b'{"features": [{"id": "us1", "geometry": {"coordinates": [2.0, 1.0, 10.0]}, '
+                   b'"properties": {"mag": 5.1, "time": 1577836800000, "place": "Testville", "sig": 400, "tsunami": 0}}]}')
+        with patch.object(self.dashboard.fetcher, 'fetch_geojson', return_value=geojson):
+            data = self.client.get('/api/feed?format=compact').get_json()
+
+        assert data['cols'][:4] == ['lat', 'lon', 'depth', 'mag']
+        assert data['rows'] == [[1.0, 2.0, 10.0, 5.1, 1577836800000, 'Testville', 400, 'us1', 0]]
+
+class TestDashboardApi:
+    @pytest.fixture(autouse=True)
+    def setup_dashboard(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        self.dashboard = create_dashboard()
+        self.client = self.dashboard.app.test_client()
+
+    def test_dashboard_page_served_without_template_file(self):
+        response = self.client.get('/')
+
+        assert response.status_code == 200
+        assert b'Live Earthquake Dashboard' in response.data
+        assert response.headers['Cache-Control'] == 'public, max-age=300'
+
+    def test_recent_earthquakes(self):
+        df = pd.DataFrame([
+            {'id': 'us1', 'magnitude': 5.0, 'place': 'Testville', 'latitude': 1.0, 'longitude': 2.0,
+             'depth': 10.0, 'time': datetime(2024, 1, 1, 12, 0, 0, 250000), 'tsunami': 0, 'significance': 400},
+            {'id': 'us2', 'magnitude': 6.0, 'place': 'Elsewhere', 'latitude': 3.0, 'longitude': 4.0,
+             'depth': 20.0, 'time': datetime(2024, 1, 2), 'tsunami': 1, 'significance': 600},
+        ])
+        with patch.object(self.dashboard.fetcher, 'fetch_earthquakes', return_value=df):
+            data = self.client.get('/api/recent_earthquakes').get_json()
+
+        assert data['count'] == 2
+        assert data['max_magnitude'] == 6.0
+        assert data['avg_magnitude'] == 5.5
+        assert data['earthquakes'][0] == {
+            'id': 'us1', 'magnitude': 5.0, 'location': 'Testville', 'latitude': 1.0, 'longitude': 2.0,
+            'depth': 10.0, 'time': '2024-01-01T12:00:00.250000', 'tsunami': 0, 'significance': 400,
+        }
+        assert data['earthquakes'][1]['time'] == '2024-01-02T00:00:00'
+
+    def test_recent_earthquakes_conditional_get(self):
+        df = pd.DataFrame([{'id': 'us1', 'magnitude': 5.0, 'place': 'Testville', 'latitude': 1.0,
+                            'longitude': 2.0, 'depth': 10.0, 'time': datetime(2024, 1, 1),
+                            'tsunami': 0, 'significance': 400}])
+        with patch.object(self.dashboard.fetcher, 'fetch_earthquakes', return_value=df):
+            first = self.client.get('/api/recent_earthquakes')
+            second = self.client.get('/api/recent_earthquakes', headers={'If-None-Match': first.headers['ETag']})
+
+        assert first.status_code == 200
+        assert 'max-age=30' in first.headers['Cache-Control']
+        assert second.status_code == 304
+        assert second.data == b''
+
+    def test_stats_distribution(self):
+        now = datetime.now()
+        df = pd.DataFrame({
+            'magnitude': [2.0, 2.95, 3.0, 4.5, 5.99, 6.0, 7.8],
+            'time': [now, now, now - timedelta(days=3), now, now - timedelta(days=2), now, now],
+        })
+        with patch.object(self.dashboard.fetcher, 'fetch_rolling', return_value=df):
+            data = self.client.get('/api/stats').get_json()
+
+        assert data['total_earthquakes'] == 7
+        assert data['max_magnitude'] == 7.8
+        assert data['recent_24h'] == 5
+        assert data['magnitude_distribution'] == {
+            '2.0-2.9': 2, '3.0-3.9': 1, '4.0-4.9': 1, '5.0-5.9': 1, '6.0+': 2,
+        }
+
+class TestDashboardNotificationHandler:
+    def setup_method(self):
+        self.sio = MagicMock()
+        self.sio.emit = AsyncMock()
+        self.handler = DashboardNotificationHandler(self.sio)
+        self.alert = MagicMock(magnitude=6.1, location='Testville')
+
+    def test_send_alert_before_startup(self):
+        assert self.handler.send_alert(self.alert) is False
+        self.sio.emit.assert_not_called()
+
+    def test_send_alert_schedules_emit_on_server_loop(self):
+        loop = asyncio.new_event_loop()
+        try:
+            self.handler.loop = loop
+            assert self.handler.send_alert(self.alert) is True
+            loop.run_until_complete(asyncio.sleep(0))
+        finally:
+            loop.close()
+
+        event, payload = self.sio.emit.await_args.args
+        assert event == 'earthquake_alerts'
+        assert [alert['magnitude'] for alert in payload] == [6.1]
+
+    def test_send_alerts_emits_one_batch(self):
+        second = MagicMock(magnitude=5.2, location='Elsewhere')
+        loop = asyncio.new_event_loop()
+        try:
+            self.handler.loop = loop
+            assert self.handler.send_alerts([self.alert, second]) is True
+            loop.run_until_complete(asyncio.sleep(0))
+        finally:
+            loop.close()
+
+        self.sio.emit.assert_awaited_once()
+        event, payload = self.sio.emit.await_args.args
+        assert [alert['location'] for alert in payload] == ['Testville', 'Elsewhere']
+
+    def test_socket_json_encodes_numpy_scalars(self):
+        encoded = SocketIOJSON.dumps({'magnitude': np.float64(6.1), 'tsunami': np.int8(1)}, separators=(',', ':'))
+        assert encoded == '{"magnitude":6.1,"tsunami":1}'
+        assert SocketIOJSON.loads(encoded) == {'magnitude': 6.1, 'tsunami': 1}
+
+class TestDashboardLifespan:
+    @pytest.fixture(autouse=True)
+    def setup_dashboard(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        self.dashboard = create_dashboard()
+
+    def test_monitor_runs_on_server_loop_between_startup_and_shutdown(self):
+        async def serve_lifespan():
+            events = asyncio.Queue()
+            sent = []
+
+            async def send(message):
+                sent.append(message)
+
+            await events.put({'type': 'lifespan.startup'})
+            server = asyncio.ensure_future(self.dashboard.asgi_app({'type': 'lifespan'}, events.get, send))
+            await asyncio.sleep(0.1)
+            running = not self.dashboard.monitoring_task.done()
+            await events.put({'type': 'lifespan.shutdown'})
+            await server
+            return running, sent
+
+        with patch.object(self.dashboard.monitor, 'check_for_earthquakes') as mock_check:
+            running, sent = asyncio.run(serve_lifespan())
+
+        assert running
+        mock_check.assert_called_once()
+        assert self.dashboard.monitoring_task.done()
+        assert [message['type'] for message in sent] == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
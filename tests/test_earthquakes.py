@@ -0,0 +1,233 @@
+import asyncio
+import pytest
+import json
+import threading
+import time
+from datetime import datetime
+from unittest.mock import patch, MagicMock
+
+from seismowatch.earthquakes import EarthquakeDataFetcher, EarthquakeVisualizer
+
+GEOJSON = (b'{"features": [{"id": "us1", "geometry": {"coordinates": [2.0, 1.0, 10.0]}, '
+           b'"properties": {"mag": 5.1, "time": 1577836800000, "place": "Testville", '
+           b'"url": "https://example.com/us1", "tsunami": 0, "sig": 400}}]}')
+
+class TestEarthquakeDataFetcher:
+    def setup_method(self):
+        self.fetcher = EarthquakeDataFetcher()
+
+    def test_results_are_cached_per_query(self):
+        with patch.object(self.fetcher, 'fetch_geojson', return_value=GEOJSON) as mock_fetch:
+            first = self.fetcher.fetch_earthquakes(min_magnitude=4.0, days=1, limit=10)
+            first['magnitude'] = 0.0  # Callers get their own copy
+            second = self.fetcher.fetch_earthquakes(min_magnitude=4.0, days=1, limit=10)
+            self.fetcher.fetch_earthquakes(min_magnitude=5.0, days=1, limit=10)
+
+        assert second['magnitude'].tolist() == [5.1]
+        assert mock_fetch.call_count == 2
+
+    def test_force_refresh_and_expiry_bypass_cache(self):
+        with patch.object(self.fetcher, 'fetch_geojson', return_value=GEOJSON) as mock_fetch:
+            self.fetcher.fetch_earthquakes()
+            self.fetcher.fetch_earthquakes(force_refresh=True)
+            self.fetcher.cache_ttl = 0
+            self.fetcher.fetch_earthquakes()
+
+        assert mock_fetch.call_count == 3
+
+    def test_failures_are_not_cached(self):
+        with patch.object(self.fetcher, 'fetch_geojson', side_effect=ValueError('bad payload')):
+            assert self.fetcher.fetch_earthquakes().empty
+        with patch.object(self.fetcher, 'fetch_geojson', return_value=GEOJSON):
+            assert len(self.fetcher.fetch_earthquakes()) == 1
+
+    def test_concurrent_identical_fetches_share_one_request(self):
+        release = threading.Event()
+
+        def slow_fetch(*args):
+            release.wait(5)
+            return GEOJSON
+
+        with patch.object(self.fetcher, 'fetch_geojson', side_effect=slow_fetch) as mock_fetch:
+            results = []
+            threads = [threading.Thread(target=lambda: results.append(self.fetcher.fetch_earthquakes()))
+                       for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            while not self.fetcher._inflight:
+                time.sleep(0.001)
+            time.sleep(0.05)  # Let the other callers queue behind the first
+            release.set()
+            for thread in threads:
+                thread.join(5)
+
+        assert mock_fetch.call_count == 1
+        assert [len(df) for df in results] == [1, 1, 1, 1]
+        assert len({id(df) for df in results}) == 4
+
+    def test_async_fetches_share_one_request_off_the_loop(self):
+        async def fetch_concurrently():
+            return await asyncio.gather(*[self.fetcher.fetch_earthquakes_async(days=1) for _ in range(3)])
+
+        with patch.object(self.fetcher, 'fetch_geojson', return_value=GEOJSON) as mock_fetch:
+            results = asyncio.run(fetch_concurrently())
+            with patch('asyncio.base_events.BaseEventLoop.run_in_executor') as mock_executor:
+                cached = asyncio.run(self.fetcher.fetch_earthquakes_async(days=1))
+
+        assert mock_fetch.call_count == 1
+        assert [len(df) for df in results] == [1, 1, 1]
+        mock_executor.assert_not_called()  # Cache hits never leave the loop
+        assert cached['magnitude'].tolist() == [5.1]
+
+    def test_parses_features_into_columns(self):
+        with patch.object(self.fetcher, 'fetch_geojson', return_value=GEOJSON):
+            df = self.fetcher.fetch_earthquakes()
+
+        assert list(df.columns) == ['id', 'magnitude', 'place', 'time', 'latitude', 'longitude',
+                                    'depth', 'url', 'tsunami', 'felt', 'significance']
+        row = df.iloc[0]
+        assert (row['id'], row['latitude'], row['longitude'], row['depth']) == ('us1', 1.0, 2.0, 10.0)
+        assert row['time'] == datetime.fromtimestamp(1577836800)
+        assert (row['felt'], row['significance']) == (0, 400)
+        assert (df['tsunami'].dtype, df['significance'].dtype) == ('int8', 'int16')
+
+    def test_null_tsunami_flag_parses_as_zero(self):
+        df = EarthquakeDataFetcher._parse_geojson(GEOJSON.replace(b'"tsunami": 0', b'"tsunami": null'))
+
+        assert df['tsunami'].tolist() == [0]
+        assert df['tsunami'].dtype == 'int8'
+
+    def test_query_window_is_floored_to_the_minute(self):
+        with patch.object(self.fetcher, '_query', return_value=(200, GEOJSON, {})) as mock_query:
+            self.fetcher.fetch_geojson(end_time=datetime(2024, 1, 8, 12, 34, 56, 789))
+
+        params = mock_query.call_args.args[0]
+        assert params['starttime'] == '2024-01-01T12:34:00'
+        assert params['endtime'] == '2024-01-08T12:34:00'
+
+    def test_split_days_ask_for_their_share_and_top_up(self):
+        quakes_by_day = [[('a', 6.0), ('b', 5.5), ('c', 5.0)], [('d', 4.0)], [('e', 2.0), ('f', 1.0)]]
+        day_of = {}
+
+        def fetch_day(min_magnitude, days, limit, end_time=None):
+            day = day_of.setdefault(end_time, len(day_of))
+            features = [{'id': quake_id, 'geometry': {'coordinates': [2.0, 1.0, 10.0]},
+                         'properties': {'mag': mag, 'time': 1577836800000, 'place': 'Testville',
+                                        'url': '', 'tsunami': 0, 'sig': 100}}
+                        for quake_id, mag in quakes_by_day[day][:limit]]
+            return json.dumps({'features': features}).encode()
+
+        self.fetcher.MAX_PARALLEL_FETCHES = 1  # Days are seen in order
+        with patch.object(self.fetcher, 'fetch_geojson', side_effect=fetch_day) as mock_fetch:
+            df = self.fetcher._fetch_split_by_day(2.0, 3, 2)
+
+        assert df['id'].tolist() == ['a', 'b']
+        # One row per day first; only the two days that could hide stronger
+        # quakes than the merged cutoff are fetched again in full
+        limits = [call.args[2] for call in mock_fetch.call_args_list]
+        assert limits == [1, 1, 1, 2, 2]
+
+    def test_large_multi_day_queries_are_split_per_day(self):
+        day_one = GEOJSON.replace(b'"mag": 5.1', b'"mag": 4.2')
+        day_two = GEOJSON.replace(b'"us1"', b'"us2"')
+        payloads = [day_one, day_two, day_one]
+
+        def fetch_day(min_magnitude, days, limit, end_time=None):
+            assert days == 1 and end_time is not None
+            return payloads.pop()
+
+        with patch.object(self.fetcher, 'fetch_geojson', side_effect=fetch_day) as mock_fetch:
+            self.fetcher.MAX_PARALLEL_FETCHES = 1  # Deterministic payload order
+            df = self.fetcher.fetch_earthquakes(min_magnitude=2.0, days=3, limit=1000)
+
+        assert mock_fetch.call_count == 3
+        assert df['id'].tolist() == ['us2', 'us1']
+        assert df['magnitude'].tolist() == [5.1, 4.2]
+
+    def test_unchanged_feed_is_revalidated_with_etag(self):
+        changed = MagicMock(status_code=200, headers={'ETag': '"v1"'})
+        changed.raw.read.return_value = GEOJSON
+        not_modified = MagicMock(status_code=304, headers={})
+        next_minute = MagicMock(status_code=200, headers={'ETag': '"v2"'})
+        next_minute.raw.read.return_value = GEOJSON
+        for response in (changed, not_modified, next_minute):
+            response.__enter__.return_value = response
+
+        # Two polls 30 s apart in the same minute, then one in the next minute
+        with patch('seismowatch.earthquakes.datetime', wraps=datetime) as mock_datetime, \
+                patch.object(self.fetcher.session, 'get',
+                             side_effect=[changed, not_modified, next_minute]) as mock_get:
+            mock_datetime.utcnow.side_effect = [datetime(2024, 1, 8, 12, 0, 10),
+                                                datetime(2024, 1, 8, 12, 0, 40),
+                                                datetime(2024, 1, 8, 12, 1, 10)]
+            assert self.fetcher.fetch_geojson() == GEOJSON
+            assert self.fetcher.fetch_geojson() == GEOJSON
+            assert self.fetcher.fetch_geojson() == GEOJSON
+
+        first, second, third = mock_get.call_args_list
+        assert first.kwargs['params'] == second.kwargs['params']
+        assert first.kwargs['headers'] == {}
+        assert second.kwargs['headers'] == {'If-None-Match': '"v1"'}
+        not_modified.raw.read.assert_not_called()
+        # The window moved, so the old ETag no longer applies
+        assert third.kwargs['params'] != second.kwargs['params']
+        assert third.kwargs['headers'] == {}
+
+    def test_rolling_window_syncs_incrementally(self):
+        now_ms = int(time.time() * 1000)
+
+        def payload(*quakes):
+            features = [{'id': quake_id, 'geometry': {'coordinates': [2.0, 1.0, 10.0]},
+                         'properties': {'mag': mag, 'time': now_ms - age_days * 86400000, 'place': 'Testville',
+                                        'url': '', 'tsunami': 0, 'sig': 100}}
+                        for quake_id, mag, age_days in quakes]
+            return json.dumps({'features': features}).encode()
+
+        responses = [payload(('us1', 4.0, 0), ('old', 6.0, 8)),
+                     payload(('us1', 4.4, 0), ('us2', 5.0, 0))]
+        with patch.object(self.fetcher, '_query',
+                          side_effect=lambda params, headers=None: (200, responses.pop(0), {})) as mock_query:
+            first = self.fetcher.fetch_rolling(min_magnitude=2.0, days=7, limit=10)
+            cached = self.fetcher.fetch_rolling(min_magnitude=2.0, days=7, limit=10)
+            updated = self.fetcher.fetch_rolling(min_magnitude=2.0, days=7, limit=10, force_refresh=True)
+
+        assert first['id'].tolist() == cached['id'].tolist() == ['us1']
+        assert updated[['id', 'magnitude']].values.tolist() == [['us2', 5.0], ['us1', 4.4]]
+        first_params, second_params = (call.args[0] for call in mock_query.call_args_list)
+        assert 'updatedafter' not in first_params
+        assert 'updatedafter' in second_params
+
+class TestEarthquakeVisualizer:
+    def setup_method(self):
+        self.visualizer = EarthquakeVisualizer()
+
+    def test_colors_for_matches_thresholds(self):
+        colors = self.visualizer.colors_for([3.2, 4.99, 5.0, 6.5, 7.0, 8.9, 9.0, 9.5])
+        assert colors.tolist() == ['#FFD700', '#FFD700', '#FF8C00', '#FF4500',
+                                   '#DC143C', '#8B0000', '#4B0082', '#4B0082']
+        assert self.visualizer.get_color_by_magnitude(6.0) == '#FF4500'
+
+    def test_radii_for_has_minimum(self):
+        assert self.visualizer.radii_for([1.0, 5.0]).tolist() == [5.0, 15.0]
+
+    def test_missing_magnitude_gets_lowest_color_and_radius(self):
+        assert self.visualizer.colors_for([float('nan'), 9.5]).tolist() == ['#FFD700', '#4B0082']
+        assert self.visualizer.radii_for([float('nan')]).tolist() == [5.0]
+
+    def test_earthquake_map_uses_one_geojson_layer(self):
+        df = EarthquakeDataFetcher._parse_geojson(GEOJSON)
+        geojson = self.visualizer._earthquake_geojson(df)
+        feature = geojson['features'][0]
+        assert feature['geometry']['coordinates'] == [2.0, 1.0]
+        assert feature['properties']['style'] == {'fillColor': '#FF8C00', 'radius': pytest.approx(15.3)}
+        assert feature['properties']['label'] == 'M5.1 - Testville'
+
+        html = self.visualizer.create_earthquake_map(df).get_root().render()
+        assert html.count('L.geoJson(') == 1
+        assert html.count('L.CircleMarker(') == 1  # Shared pointToLayer, not one per quake
+
+    def test_timeline_uses_one_geojson_layer(self):
+        df = EarthquakeDataFetcher._parse_geojson(GEOJSON)
+        html = self.visualizer.create_magnitude_timeline(df).get_root().render()
+        assert html.count('L.geoJson(') == 1
+        assert 'M5.1 - 2020-01-01' in html
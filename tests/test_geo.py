@@ -1,16 +1,18 @@
 import pytest
+import json
 import pandas as pd
 import folium
+import geopandas as gpd
+from shapely.geometry import Point
 from unittest.mock import patch, MagicMock
-import sys
-import os
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-
-from seismowatch.geo import GeoVisualizer, create_sample_data
+from seismowatch.geo import GeoVisualizer, create_sample_data, to_geodataframe
 
 class TestGeoVisualizer:
-    def setup_method(self):
+    @pytest.fixture(autouse=True)
+    def setup_visualizer(self, tmp_path, monkeypatch):
+        # Geocoding results are cached in the working directory
+        monkeypatch.chdir(tmp_path)
         self.geo_viz = GeoVisualizer()
     
     def test_create_basic_map(self):
@@ -63,6 +65,34 @@ class TestGeoVisualizer:
         
         assert result is None
     
+    @patch('seismowatch.geo.Nominatim')
+    def test_geocode_address_is_cached_on_disk(self, mock_nominatim):
+        mock_geocoder = mock_nominatim.return_value
+        mock_geocoder.geocode.return_value = MagicMock(latitude=40.7128, longitude=-74.0060)
+        
+        assert GeoVisualizer().geocode_address("Times Square") == (40.7128, -74.0060)
+        # A fresh instance reads the same cache file; the key ignores case and spacing
+        assert GeoVisualizer().geocode_address("  times   SQUARE ") == (40.7128, -74.0060)
+        mock_geocoder.geocode.assert_called_once_with("Times Square")
+    
+    @patch('seismowatch.geo.time.sleep')
+    @patch('seismowatch.geo.Nominatim')
+    def test_geocode_addresses_uses_cache_and_dedupes(self, mock_nominatim, mock_sleep):
+        mock_geocoder = mock_nominatim.return_value
+        mock_geocoder.geocode.side_effect = lambda address: {
+            'Chicago': MagicMock(latitude=41.8781, longitude=-87.6298),
+            'Houston': MagicMock(latitude=29.7604, longitude=-95.3698),
+        }.get(address)
+        
+        geo_viz = GeoVisualizer()
+        geo_viz.geocode_address('Chicago')
+        results = geo_viz.geocode_addresses(['Houston', 'chicago', 'Nowhere', 'HOUSTON'])
+        
+        assert results == [(29.7604, -95.3698), (41.8781, -87.6298), None, (29.7604, -95.3698)]
+        assert [c.args[0] for c in mock_geocoder.geocode.call_args_list] == ['Chicago', 'Houston', 'Nowhere']
+        # Uncached lookups after the first wait out Nominatim's rate limit
+        assert mock_sleep.call_count == 1
+    
     @patch('seismowatch.geo.Nominatim')
     def test_geocode_address_exception(self, mock_nominatim):
         mock_geocoder = MagicMock()
@@ -90,6 +120,9 @@ class TestGeoVisualizer:
         
         assert fig.layout.title.text == 'Test Map'
         assert len(fig.data) == 1
+        # Only the requested columns are embedded for hover labels
+        assert 'city' not in fig.data[0].hovertemplate
+        assert fig.data[0].customdata is None
     
     def test_create_heatmap_with_center(self):
         locations = [(40.7128, -74.0060), (40.7589, -73.9851)]
@@ -109,6 +142,34 @@ class TestGeoVisualizer:
             
             assert isinstance(map_obj, folium.Map)
             assert map_obj.location == [40.5, -74.5]
+    
+    def test_create_choropleth_map_simplifies_geometry(self):
+        # Finely sampled circles: simplification should drop most vertices
+        gdf = gpd.GeoDataFrame({'value': [1.0, 2.0]},
+                               geometry=[Point(0, 0).buffer(1, 256), Point(3, 0).buffer(1, 256)])
+        
+        with patch('folium.Choropleth') as mock_choropleth:
+            map_obj = self.geo_viz.create_choropleth_map(gdf, 'value', simplify_tol=0.01)
+        
+        assert map_obj.location == [0.0, 1.5]
+        geo_data = mock_choropleth.call_args.kwargs['geo_data']
+        assert len(geo_data) < len(gdf.to_json()) / 4
+        assert '"value"' not in geo_data
+        assert [f['id'] for f in json.loads(geo_data)['features']] == ['0', '1']
+        
+        # Simplification is opt-in
+        with patch('folium.Choropleth') as mock_choropleth:
+            self.geo_viz.create_choropleth_map(gdf, 'value')
+        assert mock_choropleth.call_args.kwargs['geo_data'] == gdf.geometry.to_json()
+    
+    def test_filter_by_bbox(self):
+        gdf = to_geodataframe(create_sample_data())
+        
+        # Roughly the western US: Los Angeles and Phoenix
+        result = self.geo_viz.filter_by_bbox(gdf, -125.0, 30.0, -105.0, 40.0)
+        
+        assert list(result['name']) == ['Los Angeles', 'Phoenix']
+        assert self.geo_viz.filter_by_bbox(gdf, 0.0, 0.0, 10.0, 10.0).empty
 
 class TestSampleData:
     def test_create_sample_data(self):
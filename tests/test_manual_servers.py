@@ -0,0 +1,14 @@
+import pytest
+import importlib
+
+@pytest.mark.parametrize('module_name, expected', [
+    ('sample_server', 'IT WORKS!'),
+    ('minimal_server', 'HELLO WORLD TEST'),
+])
+def test_manual_server_root(module_name, expected):
+    app = importlib.import_module(module_name).app
+    app.config['TESTING'] = True
+
+    response = app.test_client().get('/')
+    assert response.status_code == 200
+    assert expected.encode() in response.data
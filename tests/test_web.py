@@ -1,48 +1,74 @@
 import pytest
-import json
-import sys
-import os
+import gzip
 import pandas as pd
+from operator import itemgetter
 from unittest.mock import patch
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from seismowatch.web import create_app, with_marker_style
 
-from seismowatch.web import create_app
+# Built once; the routes only read the fetched frame
+EARTHQUAKES_DF = pd.DataFrame([{
+    'magnitude': 5.0, 'place': 'Testville', 'latitude': 1.0, 'longitude': 2.0,
+    'depth': 10.0, 'time': pd.Timestamp('2020-01-01T00:00:00'),
+}])
+
+@pytest.fixture(scope='module')
+def fetcher():
+    # Patched once for the module; the app builds its shared fetcher from it
+    with patch('seismowatch.web.EarthquakeDataFetcher') as fetcher_cls:
+        fetcher_cls.return_value.fetch_earthquakes.return_value = EARTHQUAKES_DF
+        yield fetcher_cls.return_value
+
+@pytest.fixture(scope='module')
+def app(fetcher):
+    # Routes don't mutate the app, so one instance serves the whole module
+    app = create_app()
+    app.config['TESTING'] = True
+    return app
+
+@pytest.fixture(scope='module')
+def client(app):
+    return app.test_client()
+
+@pytest.fixture(scope='module')
+def responses(client):
+    # Plain GETs the read-only tests share, each requested once per module
+    return {path: client.get(path) for path in ['/', '/api/info', '/api/health', '/api/earthquakes']}
 
 class TestWebApp:
-    def setup_method(self):
-        self.app = create_app()
-        self.app.config['TESTING'] = True
-        self.client = self.app.test_client()
+    @pytest.fixture(autouse=True)
+    def setup_client(self, app, client, fetcher, responses):
+        self.app = app
+        self.client = client
+        self.responses = responses
+        self.fetcher = fetcher
+        fetcher.reset_mock()
+        fetcher.fetch_earthquakes.return_value = EARTHQUAKES_DF
     
     def test_home_route(self):
-        response = self.client.get('/')
+        response = self.responses['/']
         assert response.status_code == 200
         
         # Home route now returns HTML dashboard
         assert 'text/html' in response.content_type
-        html_content = response.data.decode('utf-8')
-        assert 'Earthquake Dashboard' in html_content
-        assert 'SeismoWatch' in html_content or 'earthquake' in html_content.lower()
+        assert b'Earthquake Dashboard' in response.data
+        assert b'SeismoWatch' in response.data or b'earthquake' in response.data.lower()
     
     def test_info_route(self):
-        response = self.client.get('/api/info')
+        response = self.responses['/api/info']
         assert response.status_code == 200
         
-        data = json.loads(response.data)
-        assert data['project'] == 'SeismoWatch'
-        assert 'description' in data
-        assert 'capabilities' in data
-        assert isinstance(data['capabilities'], list)
-        assert 'CLI' in data['capabilities']
-        assert 'Web API' in data['capabilities']
-        assert 'Earthquake Monitoring' in data['capabilities']
+        project, description, capabilities = itemgetter('project', 'description', 'capabilities')(response.get_json())
+        assert project == 'SeismoWatch'
+        assert description
+        assert isinstance(capabilities, list)
+        assert {'CLI', 'Web API', 'Earthquake Monitoring'} <= set(capabilities)
     
     def test_health_route(self):
-        response = self.client.get('/api/health')
+        response = self.responses['/api/health']
         assert response.status_code == 200
         
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['status'] == 'healthy'
     
     def test_nonexistent_route(self):
@@ -51,33 +77,60 @@ class TestWebApp:
     
     def test_response_content_type(self):
         # Home route returns HTML
-        response = self.client.get('/')
-        assert 'text/html' in response.content_type
+        assert 'text/html' in self.responses['/'].content_type
         
         # API routes return JSON
-        response = self.client.get('/api/info')
-        assert response.content_type == 'application/json'
-        
-        response = self.client.get('/api/health')
-        assert response.content_type == 'application/json'
+        assert self.responses['/api/info'].content_type == 'application/json'
+        assert self.responses['/api/health'].content_type == 'application/json'
     
-    @patch('seismowatch.web.EarthquakeDataFetcher')
-    def test_earthquakes_api(self, mock_fetcher_cls):
-        mock_fetcher = mock_fetcher_cls.return_value
-        mock_fetcher.fetch_earthquakes.return_value = pd.DataFrame([
-            {
-                'magnitude': 5.0,
-                'place': 'Testville',
-                'latitude': 1.0,
-                'longitude': 2.0,
-                'depth': 10.0,
-                'time': pd.Timestamp('2020-01-01T00:00:00')
-            }
-        ])
-
-        response = self.client.get('/api/earthquakes')
+    def test_earthquakes_api(self):
+        response = self.responses['/api/earthquakes']
         assert response.status_code == 200
 
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data['count'] == 1
-        assert isinstance(data['earthquakes'], list)
\ No newline at end of file
+        assert isinstance(data['earthquakes'], list)
+        assert data['earthquakes'][0]['color'] == '#DC143C'
+        assert data['earthquakes'][0]['radius'] == 15.0
+
+    def test_earthquakes_api_conditional_get(self):
+        first = self.client.get('/api/earthquakes')
+        second = self.client.get('/api/earthquakes', headers={'If-None-Match': first.headers['ETag']})
+
+        assert first.status_code == 200
+        assert first.headers['Cache-Control'] == 'public, max-age=30'
+        assert second.status_code == 304
+        assert second.data == b''
+
+        # A revised magnitude changes the validator
+        self.fetcher.fetch_earthquakes.return_value = EARTHQUAKES_DF.assign(magnitude=5.2)
+        third = self.client.get('/api/earthquakes', headers={'If-None-Match': first.headers['ETag']})
+        assert third.status_code == 200
+
+        # So does a revision that leaves time, count and magnitudes alone
+        self.fetcher.fetch_earthquakes.return_value = EARTHQUAKES_DF.assign(place='Elsewhere')
+        fourth = self.client.get('/api/earthquakes', headers={'If-None-Match': first.headers['ETag']})
+        assert fourth.status_code == 200
+
+    def test_marker_style_for_missing_magnitude(self):
+        styled = with_marker_style(pd.DataFrame({'magnitude': [float('nan'), 3.0, 7.5]}))
+        assert styled['color'].tolist() == ['#FFD700', '#FFD700', '#4B0082']
+        assert styled['radius'].tolist() == [5.0, 9.0, 22.5]
+
+    def test_home_route_is_gzipped_when_accepted(self):
+        response = self.client.get('/', headers={'Accept-Encoding': 'gzip'})
+
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert b'Earthquake Dashboard' in gzip.decompress(response.data)
+
+        # Small bodies and clients without Accept-Encoding get identity
+        assert 'Content-Encoding' not in self.client.get('/api/health', headers={'Accept-Encoding': 'gzip'}).headers
+        assert 'Content-Encoding' not in self.responses['/'].headers
+
+    @patch('seismowatch.web.pa', None)
+    def test_earthquakes_arrow_needs_pyarrow(self):
+        response = self.client.get('/api/earthquakes?format=arrow')
+
+        assert response.status_code == 406
+        assert 'pyarrow' in response.get_json()['error']